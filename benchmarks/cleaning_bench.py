@@ -0,0 +1,96 @@
+"""
+Module Description:
+Benchmark of row-by-row vs vectorized vs process-pool cleaning of rabota.ru and hh.ru batches.
+
+Rows come from data/rabota_ru_vacancies.csv and data/Вакансии_hh_ru.xlsx and are replicated up to --records.
+
+Usage:
+    python -m benchmarks.cleaning_bench [--records N] [--batch-size N] [--workers N]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import itertools
+import math
+import re
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from src.pipeline.cleaning import EXPERIENCE, Cleaner, clean_batch
+
+_SALARY_RE = re.compile(r"(\d[\d ]*\d|\d)(?:\s*(?:–|-|до)\s*(\d[\d ]*\d|\d))?")
+
+
+def row_by_row(records, source):
+    """Построчная очистка, как в ноутбуках: bs4 на каждое описание и регулярка на зарплату."""
+    result = []
+    for record in records:
+        record = dict(record)
+        for column in ("description", "requirements"):
+            value = record.get(column)
+            if isinstance(value, str):
+                record[column] = BeautifulSoup(value, "html.parser").get_text("\n", strip=True)
+        salary = record.get("salary")
+        if source == "hh_ru" and isinstance(salary, str) and salary != "Не указано":
+            salary = salary.replace("\u202f", " ").replace("\xa0", " ")
+            match = _SALARY_RE.search(salary)
+            if match:
+                first = float(match.group(1).replace(" ", ""))
+                second = float(match.group(2).replace(" ", "")) if match.group(2) else None
+                record["salary_from"] = None if salary.startswith("до") else first
+                record["salary_to"] = second if second else (None if salary.startswith("от") else first)
+            record["salary_gross"] = "до вычета налогов" in salary
+            record["experience_code"] = EXPERIENCE.get(record.get("experience"))
+        result.append(record)
+    return result
+
+
+def load_records(path, records):
+    df = pd.read_excel(path) if path.endswith(".xlsx") else pd.read_csv(path)
+    base = [{key: None if isinstance(value, float) and math.isnan(value) else value for key, value in row.items()}
+            for row in df.to_dict("records")]
+    return base, list(itertools.islice(itertools.cycle(base), records))
+
+
+def bench(name, func, rows, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<45} {rows:>8} rows  {best:8.3f}s  {rows / best:12.0f} rows/sec")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rabota-csv", default="data/rabota_ru_vacancies.csv")
+    parser.add_argument("--hh-xlsx", default="data/Вакансии_hh_ru.xlsx")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    cleaner = Cleaner(workers=args.workers)
+    try:
+        for source, path in (("rabota_ru", args.rabota_csv), ("hh_ru", args.hh_xlsx)):
+            base, records = load_records(path, args.records)
+            batches = [records[i:i + args.batch_size] for i in range(0, len(records), args.batch_size)]
+            print(f"{source}: {len(records)} records replicated from {len(base)} rows of {path}")
+
+            old = bench(f"{source} row by row", lambda: row_by_row(records, source), len(records))
+            new = bench(f"{source} vectorized, batches of {args.batch_size}",
+                        lambda: [clean_batch(batch, source) for batch in batches], len(records))
+            list(cleaner.clean_batches(batches[:1], source))  # прогрев пула
+            pool = bench(f"{source} vectorized, process pool",
+                         lambda: list(cleaner.clean_batches(batches, source)), len(records))
+            print(f"speedup: {old / new:.2f}x vectorized, {old / pool:.2f}x with pool")
+    finally:
+        cleaner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Module Description:
+End-to-end benchmark: runs each source against the local fake servers and reports
+records/sec, p50/p99 request latency and peak RSS.
+
+Every source runs in a fresh process, so peak RSS is measured per source.
+
+Usage:
+    python -m benchmarks.e2e_bench [--sources rabota_ru superjob_ru hh_ru] [--latency 0.02]
+                                   [--error-rate 0.01] [--throttle-rate 0.01] [--runs 2] [--json results.json]
+
+With --runs N every source is crawled N times over the same store, so runs after the first
+show the cost of an incremental refresh.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+# Учётные данные нужны только для подписи запросов, фейковый сервер их не проверяет
+for _name in ("RABOTA_RU_APP_ID", "RABOTA_RU_CODE_TOKEN", "RABOTA_RU_APP_SECRET", "SUPERJOB_SECRET"):
+    os.environ.setdefault(_name, "bench")
+
+from benchmarks.fake_server import FakeConfig, FakeServers  # noqa: E402
+
+SOURCE_NAMES = ("rabota_ru", "superjob_ru", "hh_ru")
+
+
+def run_source(name: str, base_url: str, config: FakeConfig, concurrency: int, rate: float,
+               runs: int = 1) -> List[Dict[str, Any]]:
+    """Выполняется в отдельном процессе: обходит фейковый сайт runs раз с общим хранилищем и возвращает замеры."""
+    from src.storage.vacancy_store import VacancyStore
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        store = VacancyStore(os.path.join(workdir, "bench.db"))
+        for run in range(1, runs + 1):
+            results.append(dict(_crawl_once(name, base_url, config, concurrency, rate, store, workdir), run=run))
+        store.close()
+    return results
+
+
+def _crawl_once(name, base_url, config, concurrency, rate, store, workdir) -> Dict[str, Any]:
+    from src.orchestrator import SOURCES
+    from src.utils.metrics import RequestMetrics
+    from src.utils.rate_limiter import AdaptiveRateLimiter
+
+    metrics = RequestMetrics()
+    rate_limiter = AdaptiveRateLimiter()
+    # Хост настраивается до создания источника, поэтому его собственные стартовые лимиты не применяются
+    rate_limiter.configure(urlsplit(base_url).netloc, rate=rate, max_rate=rate, burst=concurrency)
+
+    options = {
+        "store": store, "base_url": base_url, "output_dir": workdir, "metrics": metrics,
+        "rate_limiter": rate_limiter, "max_connections_per_host": concurrency,
+    }
+    if name == "rabota_ru":
+        options.update(concurrency=concurrency, start_id=config.rabota_start,
+                       end_id=config.rabota_start + config.rabota_ids)
+
+    async def crawl():
+        async with SOURCES[name](**options) as source:
+            return await source.search()
+
+    started = time.perf_counter()
+    df = asyncio.run(crawl())
+    elapsed = time.perf_counter() - started
+
+    latency = metrics.latency()
+    statuses: Dict[str, int] = {}
+    for endpoint in metrics.snapshot()["endpoints"]:
+        for status, count in endpoint["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    return {
+        "source": name,
+        "records": len(df),
+        "seconds": elapsed,
+        "records_per_sec": len(df) / elapsed if elapsed else 0.0,
+        "requests": latency.count,
+        "statuses": statuses,
+        "p50_ms": (latency.quantile(0.5) or 0.0) * 1000,
+        "p99_ms": (latency.quantile(0.99) or 0.0) * 1000,
+        # ru_maxrss в Linux - в килобайтах; дочерние процессы (пул разбора hh.ru) учитываются отдельно
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", nargs="+", choices=SOURCE_NAMES, default=list(SOURCE_NAMES))
+    parser.add_argument("--latency", type=float, default=FakeConfig.latency)
+    parser.add_argument("--jitter", type=float, default=FakeConfig.jitter)
+    parser.add_argument("--error-rate", type=float, default=FakeConfig.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=FakeConfig.throttle_rate)
+    parser.add_argument("--rabota-ids", type=int, default=FakeConfig.rabota_ids)
+    parser.add_argument("--superjob-total", type=int, default=FakeConfig.superjob_total)
+    parser.add_argument("--hh-pages", type=int, default=FakeConfig.hh_pages)
+    parser.add_argument("--hh-fixtures-dir", help="directory with saved hh.ru search pages (*.html)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=1000.0, help="requests/sec allowed per fake host")
+    parser.add_argument("--runs", type=int, default=1, help="crawls per source over the same store")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        rabota_ids=args.rabota_ids, superjob_total=args.superjob_total, hh_pages=args.hh_pages,
+        hh_fixtures_dir=args.hh_fixtures_dir,
+    )
+    print(f"fake server config: {asdict(config)}")
+    results = []
+    with FakeServers(config) as servers:
+        for name in args.sources:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                source_results = pool.submit(run_source, name, servers.base_url(name), config, args.concurrency,
+                                             args.rate, args.runs).result()
+            results.extend(source_results)
+            for result in source_results:
+                print(f"{name:<12} run {result['run']} {result['records']:>7} records {result['seconds']:7.2f}s "
+                      f"{result['records_per_sec']:9.1f} rec/s  {result['requests']:>6} requests "
+                      f"p50 {result['p50_ms']:7.1f}ms  p99 {result['p99_ms']:7.1f}ms  "
+                      f"peak RSS {result['peak_rss_mb']:6.1f} MiB "
+                      f"(+{result['children_peak_rss_mb']:.1f} MiB children)  statuses {result['statuses']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
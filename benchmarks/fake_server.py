@@ -0,0 +1,256 @@
+"""
+Module Description:
+Local stand-in for the rabota.ru API, SuperJob API and hh.ru search pages with configurable latency,
+server errors and 429s, so sources can be run and measured without touching the live sites.
+
+Usage (serve until Ctrl-C):
+    python -m benchmarks.fake_server [--latency 0.05] [--error-rate 0.01] [--throttle-rate 0.02]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.hh_extract_bench import CARD_TEMPLATE, PAGE_TEMPLATE
+from benchmarks.mapper_bench import rabota_ru_payloads
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 0.02
+    jitter: float = 0.01
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 0
+    # rabota.ru: диапазон ID и доля существующих вакансий в нём
+    rabota_start: int = 46955330
+    rabota_ids: int = 2000
+    rabota_density: float = 0.7
+    rabota_csv: str = "data/rabota_ru_vacancies.csv"
+    # SuperJob: вакансий на запрос и размер общего пула ID, из которого пересекаются выдачи запросов
+    superjob_total: int = 300
+    superjob_pool: int = 20_000
+    # hh.ru: страниц на роль, карточек на странице и каталог с сохранёнными страницами выдачи
+    hh_pages: int = 3
+    hh_cards: int = 100
+    hh_fixtures_dir: Optional[str] = None
+    seed: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_FakeHTTPServer"
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        api = self.server.api
+        status = api.fault()
+        if status == 429:
+            return self._reply(429, b"", "text/plain", {"Retry-After": str(api.config.retry_after)})
+        if status:
+            return self._reply(status, b"", "text/plain")
+
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        handler = api.routes.get(parts.path)
+        if handler is None:
+            return self._reply(404, b"", "text/plain")
+        status, payload, content_type = handler(query, body)
+        self._reply(status, payload, content_type)
+
+    def _reply(self, status: int, payload: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, api: "FakeApi"):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.api = api
+
+
+class FakeApi:
+    """Общая часть фейковых API: задержка ответа и случайные 5xx/429 с фиксированным seed."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.routes = {}
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    def fault(self) -> Optional[int]:
+        with self._lock:
+            delay = max(self.config.latency + self._random.uniform(-1, 1) * self.config.jitter, 0.0)
+            roll = self._random.random()
+        time.sleep(delay)
+        if roll < self.config.throttle_rate:
+            return 429
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return 503
+        return None
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class RabotaRuApi(FakeApi):
+    def __init__(self, config: FakeConfig):
+        super().__init__(config)
+        self.payloads = list(rabota_ru_payloads(config.rabota_csv)) if os.path.exists(config.rabota_csv) else [{}]
+        self.routes = {
+            "/oauth/token.json": self.token,
+            "/v6/vacancy.json": self.vacancy,
+        }
+
+    def exists(self, vacancy_id: int) -> bool:
+        offset = vacancy_id - self.config.rabota_start
+        if not 0 <= offset < self.config.rabota_ids:
+            return False
+        return zlib.crc32(str(vacancy_id).encode()) % 1000 < self.config.rabota_density * 1000
+
+    def token(self, query, body):
+        return 200, _json({"access_token": "fake-token", "expires_in": 3600}), "application/json"
+
+    def vacancy(self, query, body):
+        vacancy_id = int(json.loads(body)["request"]["vacancy_id"])
+        if not self.exists(vacancy_id):
+            return 404, _json({"error": {"code": 404, "message": "Vacancy not found"}}), "application/json"
+        payload = dict(self.payloads[vacancy_id % len(self.payloads)], id=vacancy_id)
+        return 200, _json({"response": payload}), "application/json"
+
+
+class SuperJobApi(FakeApi):
+    def __init__(self, config: FakeConfig):
+        super().__init__(config)
+        self.routes = {"/2.0/vacancies/": self.vacancies}
+
+    def vacancies(self, query, body):
+        page, count = int(query.get("page", 0)), int(query.get("count", 20))
+        # Выдача определяется только поисковыми параметрами, не сортировкой и не фильтром по дате
+        key = "&".join(f"{k}={v}" for k, v in sorted(query.items())
+                       if k not in ("page", "count", "order_field", "order_direction", "date_published_from")
+                       or (k == "order_field" and v != "date"))
+        offset = zlib.crc32(key.encode("utf-8"))
+        objects = [self._vacancy((offset + index * 7919) % self.config.superjob_pool)
+                   for index in range(self.config.superjob_total)]
+        if "date_published_from" in query:
+            objects = [o for o in objects if o["date_published"] >= int(query["date_published_from"])]
+        if query.get("order_field") == "date":
+            objects.sort(key=lambda o: o["date_published"], reverse=query.get("order_direction") != "asc")
+        total = len(objects)
+        objects = objects[page * count:(page + 1) * count]
+        payload = {"objects": objects, "total": total, "more": (page + 1) * count < total}
+        return 200, _json(payload), "application/json"
+
+    @staticmethod
+    def _vacancy(vacancy_id: int):
+        return {
+            "id": vacancy_id, "payment_from": 50_000 + vacancy_id % 100 * 1000, "payment_to": 0, "currency": "rub",
+            "date_published": 1_700_000_000 + vacancy_id, "address": "Москва", "profession": f"Вакансия {vacancy_id}",
+            "candidat": "Опыт работы от года, ответственность.", "type_of_work": {"id": 6, "title": "Полный день"},
+            "languages": [], "phone": None, "link": f"https://www.superjob.ru/vakansii/{vacancy_id}.html",
+        }
+
+
+class HHRuPages(FakeApi):
+    def __init__(self, config: FakeConfig):
+        super().__init__(config)
+        self.fixtures: List[bytes] = []
+        if config.hh_fixtures_dir:
+            for path in sorted(glob.glob(os.path.join(config.hh_fixtures_dir, "*.html"))):
+                with open(path, "rb") as f:
+                    self.fixtures.append(f.read())
+        self.routes = {"/search/vacancy": self.search}
+
+    def search(self, query, body):
+        role, page = int(query.get("professional_role", 0)), int(query.get("page", 0))
+        if self.fixtures:
+            return 200, self.fixtures[(role + page) % len(self.fixtures)], "text/html; charset=utf-8"
+        if page >= self.config.hh_pages:
+            return 200, PAGE_TEMPLATE.format(script="", nav="", cards="", pager="").encode(), "text/html"
+        first_id = (role * 1000 + page) * self.config.hh_cards
+        cards = "".join(CARD_TEMPLATE.format(id=first_id + i, filler="") for i in range(self.config.hh_cards))
+        pager = "".join(f'<a data-qa="pager-page" href="?page={i}">{i + 1}</a>' for i in range(self.config.hh_pages))
+        html = PAGE_TEMPLATE.format(script="", nav="", cards=cards, pager=pager)
+        return 200, html.encode("utf-8"), "text/html; charset=utf-8"
+
+
+class FakeServers:
+    """Поднимает по серверу на каждый сайт (отдельные хосты - отдельные лимиты запросов) в фоновых потоках."""
+
+    def __init__(self, config: Optional[FakeConfig] = None):
+        self.config = config or FakeConfig()
+        self._servers = {
+            "rabota_ru": _FakeHTTPServer(RabotaRuApi(self.config)),
+            "superjob_ru": _FakeHTTPServer(SuperJobApi(self.config)),
+            "hh_ru": _FakeHTTPServer(HHRuPages(self.config)),
+        }
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self):
+        for server in self._servers.values():
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def base_url(self, source: str) -> str:
+        host, port = self._servers[source].server_address[:2]
+        return f"http://{host}:{port}" + ("/2.0" if source == "superjob_ru" else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=FakeConfig.latency)
+    parser.add_argument("--error-rate", type=float, default=FakeConfig.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=FakeConfig.throttle_rate)
+    parser.add_argument("--hh-fixtures-dir")
+    args = parser.parse_args()
+
+    config = FakeConfig(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        hh_fixtures_dir=args.hh_fixtures_dir)
+    with FakeServers(config) as servers:
+        for source in ("rabota_ru", "superjob_ru", "hh_ru"):
+            print(f"{source:<12} {servers.base_url(source)}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
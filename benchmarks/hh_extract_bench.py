@@ -0,0 +1,135 @@
+"""
+Module Description:
+Micro-benchmark of hh.ru result page parsing: legacy BeautifulSoup path vs the card extractor.
+
+Usage:
+    python -m benchmarks.hh_extract_bench [--pages-dir DIR] [--repeat N]
+
+Without --pages-dir synthetic pages with hh.ru-like markup are generated.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from src.utils.hh_extractor import PARSER, extract_vacancies
+
+CARD_TEMPLATE = """
+<div class="magritte-redesign"><div class="vacancy-card--n77Dj8TY8VIUF0yM">
+  <h2><span><a data-qa="serp-item__title" href="https://hh.ru/vacancy/{id}">Аналитик данных {id}</a></span></h2>
+  <span class="magritte-text___pbpft_3-0-27 magritte-text_style-primary___AQ7MW_3-0-27 magritte-text_typography-label-1-regular___pi3R-_3-0-27">от 120 000 ₽\xa0до вычета налогов</span>
+  <div class="magritte-tag__label___YHV-o_3-1-3">Опыт 1-3 года</div>
+  <span data-qa="vacancy-serp__vacancy-employer-text">ООО Компания {id}</span>
+  <span data-qa="vacancy-serp__vacancy-address">Москва</span>
+  <div data-qa="vacancy-serp__vacancy_snippet_responsibility">Построение отчётов, работа с SQL и Python.</div>
+  <div data-qa="vacancy-serp__vacancy_snippet_requirement">Высшее образование, знание статистики.</div>
+  {filler}
+</div></div>
+"""
+
+
+# Базовая линия: прежний разбор страницы в HHRuSource (BeautifulSoup + html.parser, полный обход дерева)
+def parse_vacancies_html(html: str, role):
+    """Прежний парсер страницы с хешированными классами: только для сравнения скорости и результатов"""
+    soup = BeautifulSoup(html, "html.parser")
+    vacancy_elements = soup.find_all("div", class_="magritte-redesign")
+    vacancies = []
+
+    for vacancy in vacancy_elements:
+        title_tag = vacancy.find("a", {"data-qa": "serp-item__title"})
+        title = title_tag.get_text(strip=True) if title_tag else "Не указано"
+        link = title_tag["href"] if title_tag else ""
+
+        location_tag = vacancy.find("span", {"data-qa": "vacancy-serp__vacancy-address"})
+        location = location_tag.get_text(strip=True) if location_tag else "Не указано"
+
+        salary_tag = vacancy.find("span", {
+            "class": "magritte-text___pbpft_3-0-27 magritte-text_style-primary___AQ7MW_3-0-27 magritte-text_typography-label-1-regular___pi3R-_3-0-27"})
+        salary = salary_tag.get_text() if salary_tag else "Не указано"
+        if salary != "Не указано":
+            salary = salary.replace("\u202f", " ")
+            salary = salary.replace("\xa0до вычета налогов", " до вычета налогов")
+
+        company_tag = vacancy.find("span", {"data-qa": "vacancy-serp__vacancy-employer-text"})
+        company = company_tag.get_text(strip=True) if company_tag else "Не указано"
+
+        description_tag = vacancy.find("div", {"data-qa": "vacancy-serp__vacancy_snippet_responsibility"})
+        description = description_tag.get_text(strip=True) if description_tag else "Не указано"
+
+        requirements_tag = vacancy.find("div", {"data-qa": "vacancy-serp__vacancy_snippet_requirement"})
+        requirements = requirements_tag.get_text(strip=True) if requirements_tag else "Не указано"
+
+        experience_tag = vacancy.find("div", class_="magritte-tag__label___YHV-o_3-1-3")
+        experience = experience_tag.get_text(strip=True) if experience_tag else "Не указано"
+
+        vacancies.append({
+            "role_id": role,
+            "title": title,
+            "link": link,
+            "location": location,
+            "salary": salary,
+            "company": company,
+            "experience": experience,
+            "description": description,
+            "requirements": requirements
+        })
+
+    return vacancies
+
+
+PAGE_TEMPLATE = """<html><head><title>Вакансии</title><script>{script}</script></head>
+<body><header>{nav}</header><main>{cards}</main>
+<nav>{pager}</nav><footer>{nav}</footer></body></html>"""
+
+
+def synthetic_pages(count: int, cards_per_page: int = 100):
+    filler = "".join(f'<span class="magritte-text___x{i}">•</span>' for i in range(20))
+    nav = "".join(f'<a href="/link/{i}">Ссылка {i}</a>' for i in range(200))
+    pager = "".join(f'<a data-qa="pager-page" href="?page={i}">{i + 1}</a>' for i in range(20))
+    for page in range(count):
+        cards = "".join(CARD_TEMPLATE.format(id=page * cards_per_page + i, filler=filler)
+                        for i in range(cards_per_page))
+        yield PAGE_TEMPLATE.format(script="var x = 1;" * 2000, nav=nav, cards=cards, pager=pager)
+
+
+def load_pages(pages_dir: str):
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            yield f.read()
+
+
+def bench(name, func, pages, repeat):
+    cards = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            cards += len(func(html, 0))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {cards:>8} cards  {elapsed:8.3f}s  {cards / elapsed:10.1f} cards/sec")
+    return cards / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-dir", help="directory with saved hh.ru search result pages (*.html)")
+    parser.add_argument("--synthetic-pages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = list(load_pages(args.pages_dir) if args.pages_dir else synthetic_pages(args.synthetic_pages))
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / 1024:.0f} KiB of HTML, extractor parser: {PARSER}")
+
+    assert parse_vacancies_html(pages[0], 0) == extract_vacancies(pages[0], 0), "extractors disagree"
+
+    old = bench("legacy parse_vacancies_html", parse_vacancies_html, pages, args.repeat)
+    new = bench("extract_vacancies", extract_vacancies, pages, args.repeat)
+    print(f"speedup: {new / old:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
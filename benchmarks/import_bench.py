@@ -0,0 +1,71 @@
+"""
+Module Description:
+Cold start benchmark: in fresh interpreters, measures the time to import main.py and to load and construct
+each source through the registry, and lists which heavy dependencies every scenario pulled in.
+
+Usage:
+    python -m benchmarks.import_bench [--repeat 5]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "bs4", "lxml", "selenium", "webdriver_manager", "dotenv")
+
+SCENARIOS: Dict[str, str] = {
+    "import main": "import main",
+    "load superjob_ru": "import main\nmain.SOURCES['superjob_ru']",
+    "load rabota_ru": "import main\nmain.SOURCES['rabota_ru']",
+    "load hh_ru": "import main\nmain.SOURCES['hh_ru']",
+    "construct all": (
+        "import main\n"
+        "from src.storage.vacancy_store import VacancyStore\n"
+        "store = VacancyStore(':memory:')\n"
+        "sources = [main.SOURCES[name](store=store) for name in main.SOURCES]"
+    ),
+}
+
+# Замер внутри дочернего процесса: время сценария без запуска самого интерпретатора
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(code: str) -> Dict[str, object]:
+    probe = _PROBE.format(code=code, heavy=HEAVY_MODULES)
+    # Учётные данные не задаём и .env не читаем: сценарии не должны к ним обращаться
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    for name, code in SCENARIOS.items():
+        timings: List[float] = []
+        modules: List[str] = []
+        for _ in range(args.repeat):
+            result = run_scenario(code)
+            timings.append(result["seconds"])
+            modules = result["modules"]
+        print(f"{name:<18} median {statistics.median(timings) * 1000:7.1f}ms  min {min(timings) * 1000:7.1f}ms  "
+              f"heavy modules: {', '.join(modules) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Module Description:
+Benchmark of the row-by-row vs slotted-record rabota.ru mappers and row-by-row vs columnar SuperJob mappers.
+
+Payloads are rebuilt from data/rabota_ru_vacancies.csv and replicated up to --records.
+
+Usage:
+    python -m benchmarks.mapper_bench [--records N] [--batch-size N]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import itertools
+import math
+import time
+
+import pandas as pd
+
+from src.utils.records import RabotaRuVacancy, rabota_ru_frame
+from src.utils.superjob_mapper import SuperJobColumns, extend_vacancies_from_response
+
+
+def legacy_rabota_ru(json_list):
+    """Построчный маппер в том виде, в котором он был до RabotaRuVacancy."""
+    data_list = []
+    for json_data in json_list:
+        data_list.append({
+            'id': json_data.get('id'),
+            'title': json_data.get('title'),
+            'salary_from': json_data['salary'].get('from') if json_data.get('salary') else None,
+            'salary_to': json_data['salary'].get('to') if json_data.get('salary') else None,
+            'salary_currency': json_data['salary'].get('currency') if json_data.get('salary') else None,
+            'salary_pay_type': json_data['salary'].get('pay_type') if json_data.get('salary') else None,
+            'description': json_data.get('description'),
+            'contact_name': json_data['contact_person'].get('name') if json_data.get('contact_person') else None,
+            'contact_email': json_data['contact_person'].get('email') if json_data.get('contact_person') else None,
+            'contact_phone': json_data['contact_person']['phones'][0]['number_international'] if json_data.get(
+                'contact_person') and json_data['contact_person'].get('has_phone') and
+                len(json_data['contact_person']['phones']) > 0 else None,
+            'operating_schedule': json_data['operating_schedule'].get('name') if json_data.get(
+                'operating_schedule') else None,
+            'company_name': json_data['company'].get('name') if json_data.get('company') else None,
+            'company_id': json_data['company'].get('id') if json_data.get('company') else None,
+            'company_type': json_data['company'].get('type') if json_data.get('company') else None
+        })
+    return pd.DataFrame(data_list)
+
+
+def _value(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def rabota_ru_payloads(path: str):
+    df = pd.read_csv(path)
+    for row in df.to_dict("records"):
+        row = {key: _value(value) for key, value in row.items()}
+        phone = row["contact_phone"]
+        yield {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "salary": {"from": row["salary_from"], "to": row["salary_to"], "currency": row["salary_currency"],
+                       "pay_type": row["salary_pay_type"]},
+            "contact_person": {"name": row["contact_name"], "email": row["contact_email"], "has_phone": bool(phone),
+                               "phones": [{"number_international": phone}] if phone else []},
+            "operating_schedule": {"name": row["operating_schedule"]},
+            "company": {"id": row["company_id"], "name": row["company_name"], "type": row["company_type"]},
+        }
+
+
+def superjob_responses(rabota_payloads, page_size=100):
+    objects = [
+        {"id": payload["id"], "payment_from": payload["salary"]["from"], "payment_to": payload["salary"]["to"],
+         "currency": "rub", "date_published": 1700000000, "address": None, "profession": payload["title"],
+         "candidat": payload["description"], "type_of_work": {"id": 6, "title": "Полный рабочий день"},
+         "languages": [], "phone": payload["contact_person"]["phones"], "link": f"https://superjob.ru/{payload['id']}"}
+        for payload in rabota_payloads
+    ]
+    return [{"objects": objects[i:i + page_size]} for i in range(0, len(objects), page_size)]
+
+
+def bench(name, func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(func())
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<40} {rows:>8} rows  {best:8.3f}s  {rows / best:12.0f} rows/sec")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/rabota_ru_vacancies.csv")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    base = list(rabota_ru_payloads(args.csv))
+    payloads = list(itertools.islice(itertools.cycle(base), args.records))
+    batches = [payloads[i:i + args.batch_size] for i in range(0, len(payloads), args.batch_size)]
+    print(f"{len(payloads)} rabota.ru payloads rebuilt from {len(base)} rows of {args.csv}")
+
+    def records(json_list):
+        return rabota_ru_frame(RabotaRuVacancy.from_api(json_data) for json_data in json_list)
+
+    assert legacy_rabota_ru(base).equals(records(base)), "mappers disagree"
+
+    old = bench("rabota.ru legacy row dicts", lambda: legacy_rabota_ru(payloads))
+    new = bench("rabota.ru slotted records", lambda: records(payloads))
+    print(f"speedup: {old / new:.2f}x")
+
+    def batched():
+        # Как при обходе: записи батчей копятся в списке, таблица строится один раз в конце
+        vacancies = []
+        for batch in batches:
+            vacancies.extend(RabotaRuVacancy.from_api(json_data) for json_data in batch)
+        return rabota_ru_frame(vacancies)
+
+    bench(f"rabota.ru slotted records, batches of {args.batch_size}", batched)
+
+    responses = superjob_responses(payloads)
+
+    def legacy_superjob():
+        vacancies = []
+        for response in responses:
+            extend_vacancies_from_response(response, vacancies)
+        return pd.DataFrame(vacancies)
+
+    def columnar_superjob():
+        columns = SuperJobColumns()
+        for response in responses:
+            columns.extend_from_response(response)
+        return columns.to_frame()
+
+    old = bench("superjob legacy row dicts", legacy_superjob)
+    new = bench("superjob columnar", columnar_superjob)
+    print(f"speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Module Description:
+Benchmark of skill-frequency queries: pandas str.contains scans over descriptions vs the FTS5 text index.
+
+Rows come from data/rabota_ru_vacancies.csv and data/Вакансии_hh_ru.xlsx and are replicated up to --records
+per source with distinct ids.
+
+Usage:
+    python -m benchmarks.text_index_bench [--records N] [--index bench_text_index.db]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.cleaning_bench import load_records
+from src.pipeline.text_index import TextIndex
+
+SKILLS = ("python", "sql", "excel", "1с", "английский", "аналитик", "продажи", "машинное обучение", "c++", "java")
+
+
+def replicate(records, id_field):
+    """Копии записей с уникальными id, чтобы индекс не схлопывал их в одну вакансию."""
+    return [dict(record, **{id_field: copy}) for copy, record in enumerate(records)]
+
+
+def scan_counts(df, columns):
+    """Как в ноутбуках: str.contains по каждому текстовому столбцу на каждый навык."""
+    text = df[columns[0]].fillna("").astype(str)
+    for column in columns[1:]:
+        text = text + " " + df[column].fillna("").astype(str)
+    text = text.str.lower()
+    return {skill: int(text.str.contains(skill, regex=False).sum()) for skill in SKILLS}
+
+
+def run(index: TextIndex, limit: int):
+    datasets = {
+        "rabota_ru": ("data/rabota_ru_vacancies.csv", "id", ["title", "description"]),
+        "hh_ru": ("data/Вакансии_hh_ru.xlsx", "vacancy_id", ["title", "description", "requirements"]),
+    }
+    frames = {}
+    for source, (path, id_field, columns) in datasets.items():
+        _, records = load_records(path, limit)
+        records = replicate(records, id_field)
+        frames[source] = (pd.DataFrame(records), columns)
+        started = time.perf_counter()
+        for start in range(0, len(records), 5000):
+            index.add_batch(records[start:start + 5000], source)
+        print(f"{source:<10} indexed {len(records)} records in {time.perf_counter() - started:.1f}s")
+    index.optimize()
+    print(f"index size: {os.path.getsize(index.path) / 2 ** 20:.1f} MiB")
+
+    for source, (df, columns) in frames.items():
+        started = time.perf_counter()
+        scanned = scan_counts(df, columns)
+        scan_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        indexed = index.term_counts(SKILLS, source=source)
+        index_seconds = time.perf_counter() - started
+        print(f"{source:<10} str.contains {scan_seconds * 1000:9.1f} ms   index {index_seconds * 1000:7.1f} ms   "
+              f"({scan_seconds / index_seconds:.0f}x)")
+        for skill in SKILLS:
+            print(f"    {skill:<20} scan {scanned[skill]:>7}  index {indexed[skill]:>7}")
+
+    started = time.perf_counter()
+    hits = index.search("python аналитик данных", limit=5, salary_min=100_000)
+    print(f"search: {len(hits)} hits in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for hit in itertools.islice(hits, 5):
+        print(f"    {hit.score:6.2f} {hit.source:<10} {hit.title} {hit.salary_from}-{hit.salary_to} {hit.currency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50_000, help="records per source")
+    parser.add_argument("--index", help="index path; a temporary file by default")
+    args = parser.parse_args()
+
+    # Временный индекс удаляется вместе с каталогом; индекс закрывается до этого, иначе Windows не даст удалить файл
+    with tempfile.TemporaryDirectory() as workdir:
+        index = TextIndex(args.index or os.path.join(workdir, "bench_text_index.db"))
+        try:
+            run(index, args.records)
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Module Description:
+Work queue benchmark: several worker processes crawl one source against the local fake servers,
+sharing a store and a work queue. Reports wall time, stored vacancies and queue state; with
+--kill-after one worker is killed mid-crawl to show its leases being picked up by the others.
+
+Usage:
+    python -m benchmarks.work_queue_bench [--source rabota_ru] [--workers 1 2 4] [--lease-seconds 5]
+                                          [--kill-after 2]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+# Учётные данные нужны только для подписи запросов, фейковый сервер их не проверяет
+for _name in ("RABOTA_RU_APP_ID", "RABOTA_RU_CODE_TOKEN", "RABOTA_RU_APP_SECRET", "SUPERJOB_SECRET"):
+    os.environ.setdefault(_name, "bench")
+
+from benchmarks.fake_server import FakeConfig, FakeServers  # noqa: E402
+
+SOURCE_NAMES = ("rabota_ru", "superjob_ru", "hh_ru")
+RUN_ID = "bench"
+
+
+def run_worker(name: str, base_url: str, config: FakeConfig, store_path: str, output_dir: str, concurrency: int,
+               rate: float, lease_seconds: float):
+    """Выполняется в отдельном процессе: один воркер общего обхода."""
+    from src.orchestrator import SOURCES
+    from src.storage.vacancy_store import VacancyStore
+    from src.storage.work_queue import WorkQueue
+    from src.utils.rate_limiter import AdaptiveRateLimiter
+
+    store = VacancyStore(store_path)
+    work_queue = WorkQueue(store_path, run_id=RUN_ID, lease_seconds=lease_seconds,
+                           owner=f"worker-{os.getpid()}")
+    rate_limiter = AdaptiveRateLimiter()
+    rate_limiter.configure(urlsplit(base_url).netloc, rate=rate, max_rate=rate, burst=concurrency)
+    options = {
+        "store": store, "base_url": base_url, "output_dir": output_dir, "rate_limiter": rate_limiter,
+        "max_connections_per_host": concurrency, "work_queue": work_queue, "incremental": False,
+    }
+    if name == "rabota_ru":
+        options.update(concurrency=concurrency, start_id=config.rabota_start,
+                       end_id=config.rabota_start + config.rabota_ids)
+
+    async def crawl():
+        async with SOURCES[name](**options) as source:
+            await source.search()
+
+    try:
+        asyncio.run(crawl())
+    finally:
+        work_queue.close()
+        store.close()
+
+
+def run_crawl(name: str, base_url: str, config: FakeConfig, workers: int, concurrency: int, rate: float,
+              lease_seconds: float, kill_after: Optional[float]) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        store_path = os.path.join(workdir, "bench.db")
+        processes = []
+        for worker in range(workers):
+            output_dir = os.path.join(workdir, f"worker-{worker}")
+            os.makedirs(output_dir)
+            processes.append(context.Process(
+                target=run_worker,
+                args=(name, base_url, config, store_path, output_dir, concurrency, rate, lease_seconds),
+            ))
+
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        if kill_after is not None:
+            time.sleep(kill_after)
+            # Убитый воркер не отпускает аренды - их подберут остальные после lease_seconds
+            processes[0].kill()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        conn = sqlite3.connect(store_path)
+        stored = conn.execute("SELECT COUNT(*) FROM vacancies").fetchone()[0]
+        states = dict(conn.execute("SELECT state, COUNT(*) FROM work_units GROUP BY state").fetchall())
+        retried = conn.execute("SELECT COUNT(*) FROM work_units WHERE attempts > 1").fetchone()[0]
+        owners = conn.execute("SELECT COUNT(DISTINCT owner) FROM work_units").fetchone()[0]
+        conn.close()
+    return {"workers": workers, "seconds": elapsed, "stored": stored, "units": states, "retried_units": retried,
+            "owners": owners}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=SOURCE_NAMES, default="rabota_ru")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=FakeConfig.latency)
+    parser.add_argument("--rabota-ids", type=int, default=8 * 4096, help="eight ID ranges of the default size")
+    parser.add_argument("--superjob-total", type=int, default=FakeConfig.superjob_total)
+    parser.add_argument("--hh-pages", type=int, default=FakeConfig.hh_pages)
+    parser.add_argument("--concurrency", type=int, default=10, help="in-flight requests per worker")
+    parser.add_argument("--rate", type=float, default=200.0, help="requests/sec allowed per worker")
+    parser.add_argument("--lease-seconds", type=float, default=5.0)
+    parser.add_argument("--kill-after", type=float, help="kill the first worker after this many seconds")
+    args = parser.parse_args()
+
+    config = FakeConfig(latency=args.latency, rabota_ids=args.rabota_ids, superjob_total=args.superjob_total,
+                        hh_pages=args.hh_pages)
+    with FakeServers(config) as servers:
+        for workers in args.workers:
+            result = run_crawl(args.source, servers.base_url(args.source), config, workers, args.concurrency,
+                               args.rate, args.lease_seconds, args.kill_after)
+            print(f"{args.source:<12} {workers} workers {result['seconds']:7.2f}s {result['stored']:>7} stored  "
+                  f"units {result['units']}  retried {result['retried_units']}  owners {result['owners']}")
+
+
+if __name__ == "__main__":
+    main()
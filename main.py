@@ -1,19 +1,100 @@
+import argparse
 import asyncio
 import logging
 
-from src.sources.hh_ru import HHRuSource
-from src.sources.rabota_ru import RabotaRuSource
-from src.sources.super_job_ru import SuperJobSource
+from src.orchestrator import SINKS, SOURCES, SourceJob, run_sources
+from src.storage.http_cache import HttpCache
+from src.storage.vacancy_store import DEFAULT_STORE_PATH, VacancyStore
+from src.storage.work_queue import DEFAULT_LEASE_SECONDS, WorkQueue
+from src.utils.metrics import DEFAULT_EXPORT_INTERVAL, default_metrics
 from src.utils.setup_logging import setup_logging
 
 log = logging.getLogger(__name__)
 
+SOURCES_DEFAULT = "superjob_ru"
+
+
+def parse_per_source(values, option):
+    """Разбирает значения вида name=value для опций, задаваемых по источникам."""
+    result = {}
+    for value in values or []:
+        name, _, number = value.partition("=")
+        if name not in SOURCES or not number:
+            raise argparse.ArgumentTypeError(f"{option} expects <source>=<number>, got {value!r}")
+        result[name] = float(number)
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collect vacancies from hh.ru, rabota.ru and SuperJob")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCES), default=[SOURCES_DEFAULT],
+                        help="sources to crawl concurrently")
+    parser.add_argument("--output-dir", default=".", help="directory for the exported CSV files")
+    parser.add_argument("--sink", nargs="+", choices=SINKS, default=[],
+                        help="stream vacancies in batches into these sinks in --output-dir instead of "
+                             "exporting a CSV at the end: csv/jsonl/parquet files <source>_stream.*, "
+                             "dataset partitions, a separate vacancies_stream.db, the text index or the salary cube")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="SQLite vacancy store shared by all sources")
+    parser.add_argument("--cache", help="path of the HTTP response cache; disabled when omitted")
+    parser.add_argument("--concurrency", nargs="+", metavar="SOURCE=N",
+                        help="max in-flight requests per source, e.g. rabota_ru=20")
+    parser.add_argument("--time-budget", nargs="+", metavar="SOURCE=SECONDS",
+                        help="stop a source after the given number of seconds, e.g. hh_ru=1800")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore stored watermarks and re-crawl everything instead of only new vacancies")
+    parser.add_argument("--work-queue", metavar="RUN_ID",
+                        help="share the crawl with other processes using the same --store and RUN_ID: "
+                             "queries, pages and ID ranges are leased from a queue in the store")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="how long a leased unit stays with a silent worker before it is handed out again")
+    parser.add_argument("--metrics", help="file for request metrics: *.json for a JSON snapshot, "
+                                          "anything else for Prometheus text format")
+    parser.add_argument("--metrics-interval", type=float, default=DEFAULT_EXPORT_INTERVAL,
+                        help="seconds between metrics dumps")
+    return parser.parse_args()
+
+
+async def main(args):
+    concurrency = parse_per_source(args.concurrency, "--concurrency")
+    time_budget = parse_per_source(args.time_budget, "--time-budget")
+
+    store = VacancyStore(args.store)
+    cache = HttpCache(args.cache) if args.cache else None
+    work_queue = WorkQueue(args.store, run_id=args.work_queue, lease_seconds=args.lease_seconds) \
+        if args.work_queue else None
+    options = {"store": store, "cache": cache, "output_dir": args.output_dir, "incremental": not args.full,
+               "work_queue": work_queue}
+    jobs = [
+        SourceJob(
+            name=name,
+            concurrency=int(concurrency[name]) if name in concurrency else None,
+            time_budget=time_budget.get(name),
+            options=options,
+            sinks=args.sink,
+        )
+        for name in args.sources
+    ]
+    exporter = None
+    if args.metrics:
+        exporter = asyncio.create_task(default_metrics.export_periodically(args.metrics, args.metrics_interval))
+    try:
+        await run_sources(jobs)
+    finally:
+        if exporter is not None:
+            exporter.cancel()
+            await asyncio.gather(exporter, return_exceptions=True)
+        store.close()
+        if work_queue is not None:
+            work_queue.close()
+        if cache is not None:
+            cache.close()
+
+
 if __name__ == '__main__':
+    cli_args = parse_args()
     setup_logging()
     log.info("Logging setup successfully")
-    rabota_ru = RabotaRuSource()
-    # hh_ru = HHRuSource()
-    super_job = SuperJobSource()
-    asyncio.run(super_job.search())
-    # asyncio.run(rabota_ru.search())
-    # asyncio.run(hh_ru.search())
+    try:
+        asyncio.run(main(cli_args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        log.info("Crawl interrupted, checkpoints saved")
@@ -1,18 +1,33 @@
 """
 Module Description:
-This module performs XYZ functionality.
+Module provides source credentials from the environment; the .env file is read on the first
+lookup rather than at import time.
 
 Author: Denis Makukh
 Date: 27.02.2025
 """
 import os
+from functools import lru_cache
+from typing import Optional
 
-from dotenv import load_dotenv
+CREDENTIALS = ("RABOTA_RU_CODE_TOKEN", "RABOTA_RU_APP_ID", "RABOTA_RU_APP_SECRET", "SUPERJOB_SECRET")
 
-load_dotenv()
 
-RABOTA_RU_CODE_TOKEN = os.getenv("RABOTA_RU_CODE_TOKEN")
-RABOTA_RU_APP_ID = os.getenv("RABOTA_RU_APP_ID")
-RABOTA_RU_APP_SECRET = os.getenv("RABOTA_RU_APP_SECRET")
+@lru_cache(maxsize=None)
+def _load_env():
+    from dotenv import load_dotenv
 
-SUPERJOB_SECRET = os.getenv("SUPERJOB_SECRET")
+    load_dotenv()
+
+
+def get_setting(name: str) -> Optional[str]:
+    """Значение из окружения; при первом обращении подгружает .env (уже заданные переменные не меняются)."""
+    _load_env()
+    return os.getenv(name)
+
+
+def __getattr__(name: str) -> Optional[str]:
+    # Совместимость с src.config.SUPERJOB_SECRET и т.п.: значение читается при обращении, а не при импорте
+    if name in CREDENTIALS:
+        return get_setting(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
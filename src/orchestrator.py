@@ -0,0 +1,170 @@
+"""
+Module Description:
+Module runs several sources concurrently in one event loop with per-source concurrency and time budgets.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import logging
+import os
+import signal
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from src.sources.registry import SOURCES
+
+if TYPE_CHECKING:
+    from src.sinks.sink import Sink
+    from src.sources.source import Source
+
+log = logging.getLogger(__name__)
+
+# Источник с собственным пулом воркеров по ID: concurrency задаёт и число воркеров
+_WORKER_POOL_SOURCES = frozenset({"rabota_ru"})
+
+# Приёмники потока записей (--sink); модули приёмников импортируются только для выбранных
+SINKS = ("csv", "jsonl", "parquet", "dataset", "sqlite", "text_index", "salary_cube")
+
+
+@dataclass
+class SourceJob:
+    name: str
+    concurrency: Optional[int] = None
+    time_budget: Optional[float] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+    # Пусто - search() с выгрузкой в CSV; иначе записи идут батчами в эти приёмники через stream_to
+    sinks: Sequence[str] = ()
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str
+    elapsed: float
+    rows: int = 0
+    error: Optional[BaseException] = None
+
+
+def build_source(job: SourceJob) -> "Source":
+    """
+    Создаёт источник; concurrency ограничивает число одновременных запросов источника.
+
+    Модуль источника импортируется здесь, при первом обращении к реестру.
+    """
+    options = dict(job.options)
+    if job.concurrency is not None:
+        options.setdefault("max_connections_per_host", job.concurrency)
+        if job.name in _WORKER_POOL_SOURCES:
+            options.setdefault("concurrency", job.concurrency)
+    return SOURCES[job.name](**options)
+
+
+def build_sinks(job: SourceJob, resources: ExitStack) -> List["Sink"]:
+    """
+    Создаёт приёмники задания в его output_dir: файлы <источник>_stream.*, партиции датасета,
+    отдельное хранилище, текстовый индекс и куб зарплат. Открытые ими базы закрываются через resources.
+
+    CSV и JSONL дописываются от запуска к запуску, Parquet содержит записи последнего запуска.
+    """
+    output_dir = job.options.get("output_dir", ".")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def path(file_name: str) -> str:
+        return os.path.join(output_dir, file_name)
+
+    sinks = []
+    for kind in job.sinks:
+        if kind == "csv":
+            from src.sinks.csv_sink import CsvSink
+            sinks.append(CsvSink(path(f"{job.name}_stream.csv")))
+        elif kind == "jsonl":
+            from src.sinks.jsonl_sink import JsonlSink
+            sinks.append(JsonlSink(path(f"{job.name}_stream.jsonl")))
+        elif kind == "parquet":
+            from src.sinks.parquet_sink import ParquetSink
+            sinks.append(ParquetSink(path(f"{job.name}_stream.parquet")))
+        elif kind == "dataset":
+            from src.sinks.dataset_sink import DatasetSink
+            from src.storage.dataset import DEFAULT_DATASET_ROOT
+            sinks.append(DatasetSink(job.name, path(DEFAULT_DATASET_ROOT)))
+        elif kind == "sqlite":
+            from src.pipeline.near_duplicates import ID_FIELDS
+            from src.sinks.sqlite_sink import SqliteSink
+            from src.storage.vacancy_store import VacancyStore
+            store = VacancyStore(path("vacancies_stream.db"))
+            resources.callback(store.close)
+            sinks.append(SqliteSink(store, job.name, ID_FIELDS[job.name]))
+        elif kind == "text_index":
+            from src.pipeline.text_index import DEFAULT_INDEX_PATH, TextIndex
+            from src.sinks.text_index_sink import TextIndexSink
+            index = TextIndex(path(DEFAULT_INDEX_PATH))
+            resources.callback(index.close)
+            sinks.append(TextIndexSink(index, job.name))
+        elif kind == "salary_cube":
+            from src.pipeline.salary_cube import DEFAULT_CUBE_PATH, SalaryCube
+            from src.sinks.salary_cube_sink import SalaryCubeSink
+            cube = SalaryCube(path(DEFAULT_CUBE_PATH))
+            resources.callback(cube.close)
+            sinks.append(SalaryCubeSink(cube, job.name))
+        else:
+            raise ValueError(f"Unknown sink {kind!r}, expected one of {SINKS}")
+    return sinks
+
+
+async def run_job(job: SourceJob) -> JobResult:
+    """Запускает один источник; по истечении бюджета времени поиск отменяется, источник сохраняет прогресс."""
+    started = time.monotonic()
+    try:
+        async with build_source(job) as source:
+            if job.sinks:
+                from src.sinks.sink import stream_to
+
+                with ExitStack() as resources:
+                    sinks = build_sinks(job, resources)
+                    rows = await asyncio.wait_for(stream_to(source, sinks), timeout=job.time_budget)
+            else:
+                rows = len(await asyncio.wait_for(source.search(), timeout=job.time_budget))
+        return JobResult(job.name, "done", time.monotonic() - started, rows=rows)
+    except asyncio.TimeoutError:
+        log.warning(f"Source {job.name} exceeded its time budget of {job.time_budget}s")
+        return JobResult(job.name, "timeout", time.monotonic() - started)
+    except asyncio.CancelledError:
+        log.warning(f"Source {job.name} cancelled, progress flushed")
+        raise
+    except Exception as e:
+        log.exception(f"Source {job.name} failed")
+        return JobResult(job.name, "failed", time.monotonic() - started, error=e)
+
+
+async def run_sources(jobs: List[SourceJob]) -> List[JobResult]:
+    """Запускает все источники одновременно; SIGINT/SIGTERM отменяют их с сохранением чекпоинтов."""
+    main_task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, main_task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    tasks = [asyncio.create_task(run_job(job), name=job.name) for job in jobs]
+    try:
+        results = await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        log.warning("Crawl interrupted, waiting for sources to flush checkpoints")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    for result in results:
+        log.info(f"Source {result.name}: {result.status} in {result.elapsed:.1f}s, {result.rows} rows")
+    return results
@@ -0,0 +1,193 @@
+"""
+Module Description:
+Module normalizes vacancy batches: HTML descriptions to text, salary strings to numbers and experience labels to codes.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import html
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+NOT_SPECIFIED = "Не указано"
+
+# Колонки с HTML/текстом, которые нужно привести к чистому тексту
+TEXT_COLUMNS = {
+    "hh_ru": ("description", "requirements"),
+    "rabota_ru": ("description",),
+    "superjob_ru": ("candidat",),
+}
+
+# Поля зарплаты (от, до, валюта) каждого источника после clean_frame
+SALARY_FIELDS = {
+    "hh_ru": ("salary_from", "salary_to", "salary_currency"),
+    "rabota_ru": ("salary_from", "salary_to", "salary_currency"),
+    "superjob_ru": ("payment_from", "payment_to", "currency"),
+}
+
+CURRENCIES = {
+    "₽": "RUB", "руб": "RUB", "$": "USD", "€": "EUR", "₸": "KZT", "so'm": "UZS", "сум": "UZS", "br": "BYN",
+    "₼": "AZN", "₾": "GEL", "сом": "KGS", "rub": "RUB", "usd": "USD", "eur": "EUR", "uzs": "UZS", "kzt": "KZT",
+}
+PERIODS = {"месяц": "month", "мес": "month", "смену": "shift", "час": "hour", "день": "day", "год": "year"}
+
+# Метки опыта hh.ru -> коды опыта из API hh.ru
+EXPERIENCE = {
+    "Без опыта": "noExperience",
+    "Опыт 1-3 года": "between1And3",
+    "Опыт 3-6 лет": "between3And6",
+    "Опыт более 6 лет": "moreThan6",
+}
+EXPERIENCE_MIN_YEARS = {"noExperience": 0, "between1And3": 1, "between3And6": 3, "moreThan6": 6}
+
+_BLOCK_TAG_RE = re.compile(r"(?i)<\s*(?:br|/p|/li|/div|/h\d)\s*/?>")
+_TAG_RE = re.compile(r"<[^>]+>")
+_NUMBER = r"\d[\d ]*\d|\d"
+_CURRENCY_RE = "(" + "|".join(sorted(map(re.escape, CURRENCIES), key=len, reverse=True)) + ")"
+_HH_VACANCY_ID_RE = r"/vacancy/(\d+)"
+_PERIOD_RE = r"за\s+(" + "|".join(PERIODS) + ")"
+
+
+def _html_to_text(value: str) -> str:
+    value = _TAG_RE.sub(" ", _BLOCK_TAG_RE.sub("\n", value))
+    if "&" in value:
+        value = html.unescape(value)
+    # split() без аргументов схлопывает пробелы и &nbsp; быстрее регулярного выражения
+    return "\n".join(filter(None, (" ".join(line.split()) for line in value.split("\n"))))
+
+
+def html_to_text(series: pd.Series) -> pd.Series:
+    """Убирает теги и HTML-сущности; границы абзацев и пунктов списка становятся переводами строк."""
+    values = [_html_to_text(value) if isinstance(value, str) else None for value in series.to_numpy(object)]
+    return pd.Series(values, index=series.index, dtype=object).replace("", None)
+
+
+def parse_salary(series: pd.Series) -> pd.DataFrame:
+    """
+    Разбирает строки зарплаты hh.ru ("от 100 000 ₽ за месяц, на руки", "80 000 – 120 000 ₽ ...")
+    в колонки salary_from, salary_to, salary_currency, salary_gross и salary_period.
+
+    Различных строк зарплаты на порядки меньше, чем вакансий, поэтому разбираются только
+    уникальные значения, а результат раскладывается обратно по кодам.
+    """
+    codes, uniques = pd.factorize(series.where(series != NOT_SPECIFIED))
+    text = pd.Series(uniques, dtype=object).astype("string").str.replace("[\u202f\xa0]", " ", regex=True).str.strip()
+    lower = text.str.lower()
+
+    numbers = text.str.extract(rf"(?P<first>{_NUMBER})(?:\s*(?:–|-|до)\s*(?P<second>{_NUMBER}))?")
+    first = pd.to_numeric(numbers["first"].str.replace(" ", "", regex=False), errors="coerce").to_numpy(float)
+    second = pd.to_numeric(numbers["second"].str.replace(" ", "", regex=False), errors="coerce").to_numpy(float)
+    only_to = lower.str.startswith("до").fillna(False).to_numpy(bool)
+    only_from = lower.str.startswith("от").fillna(False).to_numpy(bool) & np.isnan(second)
+
+    # "от X" - только нижняя граница, "до X" - только верхняя, "X" без предлога - фиксированная сумма
+    parsed = pd.DataFrame({
+        "salary_from": np.where(only_to, np.nan, first),
+        "salary_to": np.where(~np.isnan(second), second, np.where(only_from, np.nan, first)),
+        "salary_currency": lower.str.extract(_CURRENCY_RE, expand=False).map(CURRENCIES),
+        "salary_gross": pd.Series(pd.NA, index=text.index, dtype="boolean")
+        .mask(lower.str.contains("на руки", regex=False, na=False), False)
+        .mask(lower.str.contains("до вычета налогов", regex=False, na=False), True),
+        "salary_period": lower.str.extract(_PERIOD_RE, expand=False).map(PERIODS),
+    })
+    # Код -1 (пропуск) отсутствует в индексе и превращается в пустую строку
+    result = parsed.reindex(codes)
+    result.index = series.index
+    return result
+
+
+def salary_amount(value: Any) -> Optional[float]:
+    """Сумма зарплаты числом; пропуск, мусор и 0 (так SuperJob отдаёт "не указана") - None."""
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if amount > 0 else None
+
+
+def map_experience(series: pd.Series) -> pd.DataFrame:
+    code = series.map(EXPERIENCE)
+    return pd.DataFrame({"experience_code": code, "experience_min_years": code.map(EXPERIENCE_MIN_YEARS)},
+                        index=series.index)
+
+
+def clean_frame(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Возвращает копию батча источника с очищенным текстом и разобранными зарплатой и опытом."""
+    df = df.copy()
+    for column in TEXT_COLUMNS.get(source, ()):
+        if column in df:
+            df[column] = html_to_text(df[column])
+
+    if source == "hh_ru":
+        if "link" in df:
+            # Старые выгрузки и записи хранилища без vacancy_id: ID берётся из ссылки, как при сборе
+            from_link = df["link"].astype("string").str.extract(_HH_VACANCY_ID_RE, expand=False).astype("Int64")
+            vacancy_id = df["vacancy_id"] if "vacancy_id" in df else from_link
+            if pd.api.types.is_float_dtype(vacancy_id):
+                vacancy_id = vacancy_id.astype("Int64")
+            df["vacancy_id"] = vacancy_id.astype(object).where(vacancy_id.notna(), from_link.astype(object))
+        if "salary" in df:
+            salary = parse_salary(df["salary"])
+            df[salary.columns] = salary
+        if "experience" in df:
+            experience = map_experience(df["experience"])
+            df[experience.columns] = experience
+    elif source == "rabota_ru" and "salary_currency" in df:
+        # rabota.ru отдаёт числа отдельно, а валюту и период одной строкой вида "руб./мес."
+        unit = df["salary_currency"].astype("string").str.lower()
+        df["salary_period"] = unit.str.extract(r"/\s*(\w+)", expand=False).map(PERIODS)
+        df["salary_currency"] = unit.str.extract(_CURRENCY_RE, expand=False).map(CURRENCIES)
+    elif source == "superjob_ru" and "currency" in df:
+        df["currency"] = df["currency"].astype("string").str.lower().map(CURRENCIES)
+    return df
+
+
+def clean_batch(records: List[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+    if not records:
+        return []
+    df = clean_frame(pd.DataFrame.from_records(records), source)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+class Cleaner:
+    """
+    Чистит батчи в пуле процессов, чтобы нормализация шла параллельно с обходом.
+
+    При workers=0 батчи чистятся в текущем потоке.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def clean(self, records: List[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+        if self.workers == 0:
+            return clean_batch(records, source)
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), clean_batch, records, source)
+
+    def clean_batches(self, batches: Iterable[List[Dict[str, Any]]], source: str) -> Iterator[List[Dict[str, Any]]]:
+        """Синхронный вариант для офлайн-обработки: батчи чистятся параллельно, порядок сохраняется."""
+        if self.workers == 0:
+            return (clean_batch(batch, source) for batch in batches)
+        batches = list(batches)
+        return self._get_pool().map(clean_batch, batches, [source] * len(batches))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            log.info(f"Started cleaning pool with {self.workers or os.cpu_count()} workers")
+        return self._pool
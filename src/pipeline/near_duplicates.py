@@ -0,0 +1,197 @@
+"""
+Module Description:
+Module finds near-duplicate vacancies across sources with MinHash signatures and LSH banding.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import html
+import pickle
+import re
+import zlib
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Поля каждого источника, из которых собирается текст вакансии: (название, компания, описание).
+# Маппер SuperJob не сохраняет работодателя, поэтому у него компания не участвует в сравнении
+TEXT_FIELDS = {
+    "hh_ru": ("title", "company", ("description", "requirements")),
+    "rabota_ru": ("title", "company_name", ("description",)),
+    "superjob_ru": ("profession", None, ("candidat",)),
+}
+ID_FIELDS = {
+    "hh_ru": "vacancy_id",
+    "rabota_ru": "id",
+    "superjob_ru": "vacancy_id",
+}
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+_HH_VACANCY_ID_RE = re.compile(r"/vacancy/(\d+)")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    if not text or not isinstance(text, str) or text == "Не указано":
+        return ""
+    text = html.unescape(_TAG_RE.sub(" ", text)).lower().replace("ё", "е")
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def record_id(record: Dict[str, Any], source: str) -> Optional[Hashable]:
+    """ID вакансии; у старых записей hh.ru без vacancy_id он берётся из ссылки."""
+    vacancy_id = record.get(ID_FIELDS[source])
+    if vacancy_id is None and source == "hh_ru":
+        match = _HH_VACANCY_ID_RE.search(record.get("link") or "")
+        vacancy_id = int(match.group(1)) if match else None
+    return vacancy_id
+
+
+def shingles(record: Dict[str, Any], source: str, k: int = 3) -> np.ndarray:
+    """Хеши признаков вакансии: слова названия и компании плюс k-граммы слов описания."""
+    title_field, company_field, description_fields = TEXT_FIELDS[source]
+    title = normalize_text(record.get(title_field)).split()
+    company = normalize_text(record.get(company_field)).split() if company_field else []
+    description = " ".join(normalize_text(record.get(field)) for field in description_fields).split()
+
+    features = [f"t:{word}" for word in title] + [f"c:{word}" for word in company]
+    features += [" ".join(description[i:i + k]) for i in range(max(len(description) - k + 1, 0))]
+    if not features:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features),
+                                 dtype=np.uint64, count=len(features)))
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: List[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, left: int, right: int):
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            # Корень - меньший индекс, чтобы id кластера не менялся при добавлении новых записей
+            self.parent[max(left, right)] = min(left, right)
+
+
+class NearDuplicateIndex:
+    """
+    Инкрементальный индекс почти-дубликатов.
+
+    Сигнатура MinHash из num_perm значений режется на bands полос; записи, совпавшие хотя бы
+    в одной полосе, становятся кандидатами и сравниваются по доле совпавших значений сигнатуры.
+    В корзине полосы хранится не больше max_bucket_size записей, поэтому стоимость добавления
+    не зависит от размера индекса.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.6, max_bucket_size: int = 8,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_bucket_size = max_bucket_size
+
+        # Признаки - 32-битные CRC, поэтому при a, b < 2^32 значение a*h + b < 2^64 считается в uint64
+        # без переполнения, и (a*h + b) mod p - честное универсальное хеширование
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._size = 0
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._union_find = _UnionFind()
+        self._keys: List[Tuple[str, Hashable]] = []
+        self._positions: Dict[Tuple[str, Hashable], int] = {}
+
+    def __len__(self):
+        return self._size
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def add_batch(self, records: Iterable[Dict[str, Any]], source: str) -> List[int]:
+        """Добавляет батч записей источника и возвращает id кластера для каждой."""
+        positions = []
+        for record in records:
+            key = (source, record_id(record, source))
+            if key in self._positions:
+                positions.append(self._positions[key])
+                continue
+            positions.append(self._add(key, self.signature(shingles(record, source))))
+        return [self.cluster_of(position) for position in positions]
+
+    def cluster_id(self, source: str, vacancy_id: Hashable) -> Optional[int]:
+        position = self._positions.get((source, vacancy_id))
+        return None if position is None else self.cluster_of(position)
+
+    def cluster_of(self, position: int) -> int:
+        return self._union_find.find(position)
+
+    def clusters(self, min_size: int = 2) -> Dict[int, List[Tuple[str, Hashable]]]:
+        """Кластеры из min_size и более записей: id кластера -> ключи (source, id)."""
+        groups: Dict[int, List[Tuple[str, Hashable]]] = {}
+        for position, key in enumerate(self._keys):
+            groups.setdefault(self.cluster_of(position), []).append(key)
+        return {cluster: keys for cluster, keys in groups.items() if len(keys) >= min_size}
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "NearDuplicateIndex":
+        index = cls.__new__(cls)
+        with open(path, "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+    def _add(self, key: Tuple[str, Hashable], signature: np.ndarray) -> int:
+        position = self._union_find.add()
+        self._append_signature(signature)
+        self._keys.append(key)
+        self._positions[key] = position
+
+        empty = signature[0] == np.iinfo(np.uint32).max
+        for band, buckets in enumerate(self._buckets):
+            if empty:
+                break
+            band_key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = buckets.setdefault(band_key, [])
+            for candidate in bucket:
+                if self._union_find.find(candidate) == self._union_find.find(position):
+                    continue
+                similarity = np.count_nonzero(self._signatures[candidate] == signature) / self.num_perm
+                if similarity >= self.threshold:
+                    self._union_find.union(candidate, position)
+            if len(bucket) < self.max_bucket_size:
+                bucket.append(position)
+        return position
+
+    def _append_signature(self, signature: np.ndarray):
+        if self._size == len(self._signatures):
+            grown = np.empty((max(1024, 2 * self._size), self.num_perm), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        self._signatures[self._size] = signature
+        self._size += 1
@@ -0,0 +1,382 @@
+"""
+Module Description:
+Module maintains an incrementally updated salary cube: counts, sums and mergeable quantile sketches
+of salary_from/salary_to for every combination of role, location, experience, schedule and company type.
+
+Usage:
+    python -m src.pipeline.salary_cube build [--store vacancies.db] [--cube salary_cube.db]
+    python -m src.pipeline.salary_cube query --group-by role [--source hh_ru] [--where location=Москва]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import itertools
+import json
+import logging
+import math
+import sqlite3
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.cleaning import NOT_SPECIFIED, SALARY_FIELDS, clean_frame, salary_amount
+from src.pipeline.near_duplicates import ID_FIELDS
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CUBE_PATH = "salary_cube.db"
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75, 0.9)
+ALL = "*"
+
+# Общие названия измерений -> поле источника после clean_frame
+DIMENSIONS = {
+    "hh_ru": {"role": "role_id", "location": "location", "experience": "experience_code"},
+    "rabota_ru": {"schedule": "operating_schedule", "company_type": "company_type"},
+    "superjob_ru": {"schedule": "type_of_work", "location": "address"},
+}
+# Место работы приводится к городу: "Москва, Тверская" -> "Москва"
+CITY_DIMENSIONS = ("location",)
+SALARY_COLUMNS = ("salary_from", "salary_to")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    source TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    cuboid TEXT NOT NULL,
+    dims TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (source, currency, cuboid, dims)
+);
+CREATE TABLE IF NOT EXISTS members (
+    source TEXT NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    contribution TEXT,
+    PRIMARY KEY (source, vacancy_id)
+);
+"""
+
+
+class SalarySketch:
+    """
+    Квантильный скетч в духе DDSketch: значения раскладываются по логарифмическим корзинам с шагом
+    gamma = (1 + accuracy) / (1 - accuracy), поэтому относительная ошибка квантиля не больше accuracy.
+    Скетчи складываются покорзинно, так что агрегаты по батчам и ячейкам сливаются без потерь.
+    """
+
+    def __init__(self, accuracy: float = 0.01, buckets: Optional[Dict[int, int]] = None):
+        self.accuracy = accuracy
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.buckets: Counter = Counter(buckets or {})
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    def add(self, values: np.ndarray) -> "SalarySketch":
+        values = values[values > 0]
+        if len(values):
+            keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+            self.buckets.update(dict(zip(keys.tolist(), counts.tolist())))
+        return self
+
+    def merge(self, other: "SalarySketch", sign: int = 1) -> "SalarySketch":
+        """Сливает other в скетч; при sign=-1 вычитает ранее влитые значения."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Sketches with different accuracy can't be merged")
+        if sign > 0:
+            self.buckets.update(other.buckets)
+        else:
+            self.buckets.subtract(other.buckets)
+            self.buckets = +self.buckets
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Середина корзины (gamma^(k-1), gamma^k] в смысле относительной ошибки
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return None
+
+    def to_dict(self) -> Dict[str, int]:
+        return {str(key): count for key, count in self.buckets.items()}
+
+    @classmethod
+    def from_dict(cls, buckets: Dict[str, int], accuracy: float = 0.01) -> "SalarySketch":
+        return cls(accuracy, {int(key): count for key, count in buckets.items()})
+
+
+class _CellStats:
+    """Счётчики ячейки: число вакансий и по каждому столбцу зарплаты - число значений, сумма и скетч."""
+
+    def __init__(self, accuracy: float):
+        self.count = 0
+        self.salary = {column: [0, 0.0, SalarySketch(accuracy)] for column in SALARY_COLUMNS}
+
+    def add(self, frame: pd.DataFrame):
+        self.count += len(frame)
+        for column in SALARY_COLUMNS:
+            values = frame[column].to_numpy(float)
+            values = values[~np.isnan(values)]
+            stats = self.salary[column]
+            stats[0] += len(values)
+            stats[1] += float(values.sum())
+            stats[2].add(values)
+
+    def merge(self, other: "_CellStats", sign: int = 1) -> "_CellStats":
+        self.count += sign * other.count
+        for column in SALARY_COLUMNS:
+            mine, theirs = self.salary[column], other.salary[column]
+            mine[0] += sign * theirs[0]
+            mine[1] += sign * theirs[1]
+            mine[2].merge(theirs[2], sign)
+        return self
+
+    def dumps(self) -> str:
+        return json.dumps({column: {"count": n, "sum": total, "sketch": sketch.to_dict()}
+                           for column, (n, total, sketch) in self.salary.items()})
+
+    @classmethod
+    def loads(cls, count: int, stats: str, accuracy: float) -> "_CellStats":
+        cell = cls(accuracy)
+        cell.count = count
+        for column, values in json.loads(stats).items():
+            cell.salary[column] = [values["count"], values["sum"], SalarySketch.from_dict(values["sketch"], accuracy)]
+        return cell
+
+
+class SalaryCube:
+    """
+    Агрегаты зарплат по всем сочетаниям измерений источника (cuboid - набор измерений, остальные свёрнуты в "*").
+
+    Каждый батч агрегируется сам по себе и вливается в уже сохранённые ячейки, поэтому обновление
+    стоит пропорционально батчу. Вклад каждой вакансии (валюта, измерения, зарплаты) хранится в members:
+    повторно пришедшая вакансия без изменений пропускается, а изменившаяся - вычитается из ячеек
+    по старому вкладу и добавляется по новому. Вакансия, переставшая проходить фильтры, только вычитается.
+    Учитываются только месячные зарплаты (или без указания периода) с известной валютой.
+    """
+
+    def __init__(self, path: str = DEFAULT_CUBE_PATH, accuracy: float = 0.01):
+        self.path = path
+        self.accuracy = accuracy
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(members)")}
+        if "contribution" not in columns:
+            # Куб, собранный до хранения вкладов: такие вакансии не пересчитываются, пока куб не пересобран
+            self._conn.execute("ALTER TABLE members ADD COLUMN contribution TEXT")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def add_batch(self, records: List[Dict[str, Any]], source: str) -> int:
+        """Добавляет в куб новые и изменившиеся вакансии батча и возвращает их число."""
+        frame, ids = self._prepare(records, source)
+        if not ids:
+            return 0
+        frame = frame.drop_duplicates("vacancy_id", keep="last")
+        contributions = dict(zip(frame["vacancy_id"], self._contributions(frame, source)))
+        with self._conn:
+            known = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                known.update(self._conn.execute(
+                    f"SELECT vacancy_id, contribution FROM members "
+                    f"WHERE source = ? AND vacancy_id IN ({','.join('?' * len(chunk))})",
+                    (source, *chunk),
+                ))
+            # Старые вклады вычитаются у изменившихся вакансий и у тех, что больше не проходят фильтры
+            stale = [(vacancy_id, contribution) for vacancy_id, contribution in known.items()
+                     if contribution is not None and contributions.get(vacancy_id) != contribution]
+            frame = frame[~frame["vacancy_id"].isin(known.keys() - {vacancy_id for vacancy_id, _ in stale})]
+            if stale:
+                self._merge_frame(source, pd.DataFrame([json.loads(contribution) for _, contribution in stale]), -1)
+                self._conn.executemany("DELETE FROM members WHERE source = ? AND vacancy_id = ?",
+                                       [(source, vacancy_id) for vacancy_id, _ in stale])
+            if frame.empty and not stale:
+                return 0
+            self._conn.executemany("INSERT INTO members (source, vacancy_id, contribution) VALUES (?, ?, ?)",
+                                   [(source, vacancy_id, contributions[vacancy_id])
+                                    for vacancy_id in frame["vacancy_id"]])
+            self._merge_frame(source, frame)
+        log.info(f"Added {len(frame)} {source} vacancies to the salary cube, retracted {len(stale)}")
+        return len(frame)
+
+    def query(
+            self,
+            group_by: Sequence[str] = (),
+            source: Optional[str] = None,
+            currency: str = "RUB",
+            quantiles: Sequence[float] = DEFAULT_QUANTILES,
+            **where: Any
+    ) -> pd.DataFrame:
+        """
+        Распределение зарплат по группам group_by среди вакансий, подходящих под where (измерение=значение).
+
+        Источники без нужных измерений в ответ не попадают; при source=None ячейки источников сливаются.
+        """
+        cuboid = ",".join(sorted({*group_by, *where}))
+        sql = "SELECT dims, count, stats FROM cells WHERE cuboid = ? AND currency = ?"
+        params: List[Any] = [cuboid, currency]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+
+        groups: Dict[Tuple, _CellStats] = {}
+        for dims, count, stats in self._conn.execute(sql, params):
+            dims = json.loads(dims)
+            if any(str(dims.get(name)) != str(value) for name, value in where.items()):
+                continue
+            key = tuple(dims[name] for name in group_by)
+            cell = _CellStats.loads(count, stats, self.accuracy)
+            groups[key] = groups[key].merge(cell) if key in groups else cell
+
+        rows = []
+        for key, cell in groups.items():
+            row = dict(zip(group_by, key), count=cell.count)
+            for column, (n, total, sketch) in cell.salary.items():
+                row[f"{column}_count"] = n
+                row[f"{column}_mean"] = total / n if n else None
+                for q in quantiles:
+                    row[f"{column}_p{q * 100:g}"] = sketch.quantile(q)
+            rows.append(row)
+        df = pd.DataFrame(rows)
+        return df.sort_values("count", ascending=False, ignore_index=True) if rows else df
+
+    def _prepare(self, records: List[Dict[str, Any]], source: str) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Приводит батч к столбцам vacancy_id, currency, измерениям источника и salary_from/salary_to.
+
+        Вторым значением возвращаются ID всех вакансий батча, включая не прошедшие фильтры.
+        """
+        if not records:
+            return pd.DataFrame(), []
+        df = clean_frame(pd.DataFrame.from_records(records), source)
+        from_field, to_field, currency_field = SALARY_FIELDS[source]
+        frame = pd.DataFrame({
+            "vacancy_id": df.get(ID_FIELDS[source]),
+            "currency": df.get(currency_field),
+            "salary_from": [salary_amount(value) for value in df.get(from_field, pd.Series(index=df.index))],
+            "salary_to": [salary_amount(value) for value in df.get(to_field, pd.Series(index=df.index))],
+        }, index=df.index)
+        for name, field in DIMENSIONS[source].items():
+            values = df[field] if field in df else pd.Series(None, index=df.index, dtype=object)
+            if name in CITY_DIMENSIONS:
+                values = values.astype("string").str.split(",").str[0].str.strip()
+            frame[name] = values.astype(object).where(values.notna(), NOT_SPECIFIED).astype(str)
+        ids = list(dict.fromkeys(frame["vacancy_id"].dropna().astype(str)))
+        if "salary_period" in df:
+            frame = frame[df["salary_period"].isna() | (df["salary_period"] == "month")]
+        frame = frame.dropna(subset=["vacancy_id", "currency"])
+        frame = frame[frame["salary_from"].notna() | frame["salary_to"].notna()]
+        return frame.assign(vacancy_id=frame["vacancy_id"].astype(str)), ids
+
+    @staticmethod
+    def _contributions(frame: pd.DataFrame, source: str) -> List[str]:
+        """Вклад каждой строки в ячейки - то, что нужно, чтобы потом вычесть её из куба."""
+        columns = ["currency", *DIMENSIONS[source], *SALARY_COLUMNS]
+        rows = frame[columns].astype(object).where(frame[columns].notna(), None).to_dict("records")
+        return [json.dumps(row, ensure_ascii=False, sort_keys=True) for row in rows]
+
+    def _merge_frame(self, source: str, frame: pd.DataFrame, sign: int = 1):
+        dimensions = list(DIMENSIONS[source])
+        frame = frame.astype({column: float for column in SALARY_COLUMNS})
+        for size in range(len(dimensions) + 1):
+            for cuboid in itertools.combinations(dimensions, size):
+                self._merge_cuboid(source, frame, dimensions, cuboid, sign)
+
+    def _merge_cuboid(self, source: str, frame: pd.DataFrame, dimensions: List[str], cuboid: Tuple[str, ...],
+                      sign: int = 1):
+        name = ",".join(sorted(cuboid))
+        keys = ["currency", *cuboid]
+        for key, group in frame.groupby(keys, sort=False):
+            currency, *values = key if isinstance(key, tuple) else (key,)
+            dims = json.dumps({dim: values[cuboid.index(dim)] if dim in cuboid else ALL for dim in dimensions},
+                              ensure_ascii=False, sort_keys=True)
+            delta = _CellStats(self.accuracy)
+            delta.add(group)
+            row = self._conn.execute(
+                "SELECT count, stats FROM cells WHERE source = ? AND currency = ? AND cuboid = ? AND dims = ?",
+                (source, currency, name, dims),
+            ).fetchone()
+            cell = _CellStats.loads(*row, self.accuracy) if row is not None else _CellStats(self.accuracy)
+            cell.merge(delta, sign)
+            if cell.count <= 0:
+                self._conn.execute(
+                    "DELETE FROM cells WHERE source = ? AND currency = ? AND cuboid = ? AND dims = ?",
+                    (source, currency, name, dims),
+                )
+                continue
+            self._conn.execute(
+                "INSERT INTO cells (source, currency, cuboid, dims, count, stats) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, currency, cuboid, dims) DO UPDATE SET count = excluded.count, "
+                "stats = excluded.stats",
+                (source, currency, name, dims, cell.count, cell.dumps()),
+            )
+
+
+def build_from_store(cube: SalaryCube, store_path: str, sources: Iterable[str], batch_size: int = 5000) -> int:
+    """Добавляет в куб всё, что уже лежит в хранилище вакансий."""
+    from src.storage.vacancy_store import VacancyStore
+
+    store = VacancyStore(store_path)
+    total = 0
+    try:
+        for source in sources:
+            batch = []
+            for record in store.iter_records(source):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    total += cube.add_batch(batch, source)
+                    batch = []
+            total += cube.add_batch(batch, source)
+    finally:
+        store.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental salary aggregates by role, location and more")
+    parser.add_argument("--cube", default=DEFAULT_CUBE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="add all vacancies from the vacancy store")
+    build.add_argument("--store", default="vacancies.db")
+    build.add_argument("--sources", nargs="+", default=sorted(DIMENSIONS))
+
+    query = subparsers.add_parser("query", help="salary distribution per group")
+    query.add_argument("--group-by", nargs="*", default=[],
+                       choices=sorted({name for dims in DIMENSIONS.values() for name in dims}))
+    query.add_argument("--where", nargs="*", default=[], metavar="DIMENSION=VALUE")
+    query.add_argument("--source", choices=sorted(DIMENSIONS))
+    query.add_argument("--currency", default="RUB")
+    query.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+
+    cube = SalaryCube(args.cube)
+    try:
+        if args.command == "build":
+            print(f"Added {build_from_store(cube, args.store, args.sources)} vacancies")
+        else:
+            where = dict(condition.split("=", 1) for condition in args.where)
+            df = cube.query(args.group_by, source=args.source, currency=args.currency, **where)
+            with pd.option_context("display.width", 200, "display.max_columns", None):
+                print(df.head(args.limit).to_string(index=False))
+    finally:
+        cube.close()
+
+
+if __name__ == "__main__":
+    main()
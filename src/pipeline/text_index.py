@@ -0,0 +1,329 @@
+"""
+Module Description:
+Module maintains an on-disk inverted index (SQLite FTS5) over vacancy text with Russian stemming,
+BM25 ranking, term-frequency counts and filters on source, salary and location.
+
+Usage:
+    python -m src.pipeline.text_index build [--store vacancies.db] [--index text_index.db]
+    python -m src.pipeline.text_index search "python аналитик" [--source hh_ru] [--salary-min 100000]
+    python -m src.pipeline.text_index count python sql "машинное обучение" [--location москва]
+    python -m src.pipeline.text_index top [--source rabota_ru] [--limit 50]
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import logging
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.pipeline.cleaning import SALARY_FIELDS, clean_frame, salary_amount
+from src.pipeline.near_duplicates import ID_FIELDS, TEXT_FIELDS
+from src.utils.russian_stemmer import stem
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "text_index.db"
+
+# Поле места работы; у rabota.ru места в выгрузке нет
+LOCATION_FIELDS = {
+    "hh_ru": "location",
+    "rabota_ru": None,
+    "superjob_ru": "address",
+}
+
+STOPWORDS = frozenset(
+    "и в во не на с со по для от до из к ко о об а или что как за у же бы то это при под над без через "
+    "также так все вы мы вас нас наш ваш его ее их".split()
+)
+
+# Названия технологий с "+", "#" и точкой (c++, c#, node.js, asp.net) остаются одним термом
+_TOKEN_RE = re.compile(r"[0-9a-zа-я]+(?:[+#]+|\.[a-z]{2,4}\b)?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    title TEXT,
+    salary_from REAL,
+    salary_to REAL,
+    currency TEXT,
+    location TEXT,
+    location_key TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (source, vacancy_id)
+);
+CREATE INDEX IF NOT EXISTS docs_source ON docs (source);
+CREATE VIRTUAL TABLE IF NOT EXISTS terms USING fts5(
+    title, body, tokenize = "unicode61 remove_diacritics 0 tokenchars '+#'"
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS term_stats USING fts5vocab(terms, row);
+CREATE VIRTUAL TABLE IF NOT EXISTS term_instances USING fts5vocab(terms, instance);
+"""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Термы текста: нижний регистр, ё -> е, русские слова - основы Snowball, стоп-слова отброшены."""
+    if not text or not isinstance(text, str):
+        return []
+    tokens = _TOKEN_RE.findall(text.lower().replace("ё", "е"))
+    return [stem(token) if "а" <= token[0] <= "я" else token.replace(".", "")
+            for token in tokens if token not in STOPWORDS]
+
+
+def match_expression(query: str, phrase: bool = False) -> Optional[str]:
+    """Запрос FTS5 из текста: все термы обязательны (phrase=True - подряд, как фраза)."""
+    terms = tokenize(query)
+    if not terms:
+        return None
+    if phrase:
+        return '"' + " ".join(terms) + '"'
+    return " AND ".join(f'"{term}"' for term in terms)
+
+
+@dataclass
+class SearchHit:
+    source: str
+    vacancy_id: str
+    title: Optional[str]
+    score: float
+    salary_from: Optional[float] = None
+    salary_to: Optional[float] = None
+    currency: Optional[str] = None
+    location: Optional[str] = None
+
+
+class TextIndex:
+    """
+    Инвертированный индекс по названию и тексту вакансий.
+
+    Вакансии добавляются батчами по мере обхода (upsert по (source, vacancy_id)), поэтому индекс
+    растёт инкрементально. Запросы по термам идут по спискам вхождений FTS5, а не по всему тексту.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def add_batch(self, records: List[Dict[str, Any]], source: str) -> int:
+        """Индексирует батч записей источника; повторно пришедшие вакансии переиндексируются."""
+        if not records:
+            return 0
+        df = clean_frame(pd.DataFrame.from_records(records), source)
+        title_field, _, text_fields = TEXT_FIELDS[source]
+        from_field, to_field, currency_field = SALARY_FIELDS[source]
+        location_field = LOCATION_FIELDS[source]
+        now = time.time()
+
+        rows = []
+        for record in df.astype(object).where(df.notna(), None).to_dict("records"):
+            vacancy_id = record.get(ID_FIELDS[source])
+            if vacancy_id is None:
+                continue
+            location = record.get(location_field) if location_field else None
+            rows.append((
+                (source, str(vacancy_id), record.get(title_field), salary_amount(record.get(from_field)),
+                 salary_amount(record.get(to_field)), record.get(currency_field), location,
+                 location.lower() if isinstance(location, str) else None, now),
+                " ".join(tokenize(record.get(title_field))),
+                " ".join(term for field in text_fields for term in tokenize(record.get(field))),
+            ))
+
+        with self._conn:
+            for doc, title_terms, body_terms in rows:
+                (doc_id,) = self._conn.execute(
+                    "INSERT INTO docs (source, vacancy_id, title, salary_from, salary_to, currency, location, "
+                    "location_key, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source, vacancy_id) DO UPDATE SET title = excluded.title, "
+                    "salary_from = excluded.salary_from, salary_to = excluded.salary_to, currency = excluded.currency, "
+                    "location = excluded.location, location_key = excluded.location_key, "
+                    "updated_at = excluded.updated_at RETURNING id",
+                    doc,
+                ).fetchone()
+                self._conn.execute("DELETE FROM terms WHERE rowid = ?", (doc_id,))
+                self._conn.execute("INSERT INTO terms (rowid, title, body) VALUES (?, ?, ?)",
+                                   (doc_id, title_terms, body_terms))
+        log.info(f"Indexed {len(rows)} {source} vacancies")
+        return len(rows)
+
+    def count(self, source: Optional[str] = None) -> int:
+        where, params = _filters(source=source)
+        return self._conn.execute(f"SELECT COUNT(*) FROM docs WHERE {where}", params).fetchone()[0]
+
+    def search(self, query: str, limit: int = 20, title_weight: float = 2.0, **filters) -> List[SearchHit]:
+        """
+        Вакансии, содержащие все термы запроса, по убыванию BM25; совпадение в названии весит title_weight.
+
+        Фильтры: source, salary_min, salary_max, currency, location (подстрока, без учёта регистра).
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        where, params = _filters(**filters)
+        rows = self._conn.execute(
+            "SELECT docs.source, docs.vacancy_id, docs.title, -bm25(terms, ?, 1.0) AS score, docs.salary_from, "
+            "docs.salary_to, docs.currency, docs.location FROM terms CROSS JOIN docs ON docs.id = terms.rowid "
+            f"WHERE terms MATCH ? AND {where} ORDER BY bm25(terms, ?, 1.0) LIMIT ?",
+            (title_weight, expression, *params, title_weight, limit),
+        ).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def term_counts(self, queries: Iterable[str], **filters) -> Dict[str, int]:
+        """
+        Число вакансий, где встречается каждый навык/терм; многословный навык ищется как фраза.
+
+        Принимает те же фильтры, что и search.
+        """
+        where, params = _filters(**filters)
+        counts = {}
+        # CROSS JOIN фиксирует порядок: сначала список вхождений терма, потом фильтр по docs
+        for query in queries:
+            expression = match_expression(query, phrase=True)
+            if expression is None:
+                counts[query] = 0
+                continue
+            if where == "1":
+                sql = "SELECT COUNT(*) FROM terms WHERE terms MATCH ?"
+            else:
+                sql = f"SELECT COUNT(*) FROM terms CROSS JOIN docs ON docs.id = terms.rowid WHERE terms MATCH ? AND {where}"
+            counts[query] = self._conn.execute(sql, (expression, *params)).fetchone()[0]
+        return counts
+
+    def top_terms(self, limit: int = 50, source: Optional[str] = None) -> List[Tuple[str, int, int]]:
+        """
+        Самые частые термы (основы слов): (терм, вакансий, вхождений).
+
+        Без фильтра по источнику читается готовая статистика FTS5; с фильтром - перебираются вхождения.
+        """
+        if source is None:
+            return self._conn.execute(
+                "SELECT term, doc, cnt FROM term_stats ORDER BY doc DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return self._conn.execute(
+            "SELECT term, COUNT(DISTINCT doc) AS docs, COUNT(*) FROM term_instances "
+            "CROSS JOIN docs ON docs.id = term_instances.doc WHERE docs.source = ? "
+            "GROUP BY term ORDER BY docs DESC LIMIT ?",
+            (source, limit),
+        ).fetchall()
+
+    def optimize(self):
+        """Сливает сегменты FTS5 после большой загрузки - запросы становятся быстрее."""
+        with self._conn:
+            self._conn.execute("INSERT INTO terms (terms) VALUES ('optimize')")
+
+
+def _filters(
+        source: Optional[str] = None,
+        salary_min: Optional[float] = None,
+        salary_max: Optional[float] = None,
+        currency: Optional[str] = None,
+        location: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Условие WHERE по таблице docs. Вилка зарплаты должна пересекаться с [salary_min, salary_max];
+    вакансии без зарплаты под фильтр по зарплате не попадают.
+    """
+    clauses, params = [], []
+    if source is not None:
+        clauses.append("docs.source = ?")
+        params.append(source)
+    if salary_min is not None:
+        clauses.append("COALESCE(docs.salary_to, docs.salary_from) >= ?")
+        params.append(salary_min)
+    if salary_max is not None:
+        clauses.append("COALESCE(docs.salary_from, docs.salary_to) <= ?")
+        params.append(salary_max)
+    if currency is not None:
+        clauses.append("docs.currency = ?")
+        params.append(currency)
+    if location is not None:
+        clauses.append("instr(docs.location_key, ?) > 0")
+        params.append(location.lower())
+    return " AND ".join(clauses) or "1", params
+
+
+def build_from_store(index: TextIndex, store_path: str, sources: Iterable[str], batch_size: int = 5000) -> int:
+    """Индексирует всё, что уже лежит в хранилище вакансий."""
+    from src.storage.vacancy_store import VacancyStore
+
+    store = VacancyStore(store_path)
+    total = 0
+    try:
+        for source in sources:
+            batch = []
+            for record in store.iter_records(source):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    total += index.add_batch(batch, source)
+                    batch = []
+            total += index.add_batch(batch, source)
+    finally:
+        store.close()
+    index.optimize()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text index over collected vacancies")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="index all vacancies from the vacancy store")
+    build.add_argument("--store", default="vacancies.db")
+    build.add_argument("--sources", nargs="+", default=sorted(ID_FIELDS))
+
+    commands = {
+        "search": subparsers.add_parser("search", help="rank vacancies matching all terms by BM25"),
+        "count": subparsers.add_parser("count", help="number of vacancies mentioning each skill"),
+        "top": subparsers.add_parser("top", help="most frequent terms"),
+    }
+    commands["search"].add_argument("query")
+    commands["search"].add_argument("--limit", type=int, default=20)
+    commands["count"].add_argument("skills", nargs="+")
+    commands["top"].add_argument("--limit", type=int, default=50)
+    for name, command in commands.items():
+        command.add_argument("--source", choices=sorted(ID_FIELDS))
+        if name != "top":
+            command.add_argument("--salary-min", type=float)
+            command.add_argument("--salary-max", type=float)
+            command.add_argument("--currency")
+            command.add_argument("--location")
+    args = parser.parse_args()
+
+    index = TextIndex(args.index)
+    started = time.perf_counter()
+    try:
+        if args.command == "build":
+            print(f"Indexed {build_from_store(index, args.store, args.sources)} vacancies")
+        elif args.command == "top":
+            for term, docs, occurrences in index.top_terms(args.limit, args.source):
+                print(f"{docs:>8} {occurrences:>9}  {term}")
+        else:
+            filters = dict(source=args.source, salary_min=args.salary_min, salary_max=args.salary_max,
+                           currency=args.currency, location=args.location)
+            if args.command == "search":
+                for hit in index.search(args.query, args.limit, **filters):
+                    print(f"{hit.score:7.2f}  {hit.source:<12} {hit.vacancy_id:<12} {hit.title}")
+            else:
+                for skill, count in index.term_counts(args.skills, **filters).items():
+                    print(f"{count:>8}  {skill}")
+    finally:
+        index.close()
+    print(f"{args.command} took {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
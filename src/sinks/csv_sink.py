@@ -0,0 +1,42 @@
+"""
+Module Description:
+Module writes streamed vacancy batches into a CSV file.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import csv
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.sinks.sink import Sink
+
+
+class CsvSink(Sink):
+    """Дописывает батчи в CSV; колонки берутся из первого батча, если не заданы явно."""
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None, encoding: str = "utf-8"):
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.encoding = encoding
+        self._file = None
+        self._writer = None
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        if self._writer is None:
+            self.columns = self.columns or list(batch[0])
+            write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", newline="", encoding=self.encoding)
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+            if write_header:
+                self._writer.writeheader()
+        self._writer.writerows(batch)
+        self._file.flush()
+
+    def close_sync(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
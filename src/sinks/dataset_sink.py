@@ -0,0 +1,37 @@
+"""
+Module Description:
+Module writes streamed vacancy batches into the partitioned columnar dataset.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import datetime as dt
+from typing import Any, Dict, List, Optional
+
+from src.sinks.sink import Sink
+from src.storage.dataset import DEFAULT_DATASET_ROOT, DEFAULT_ROW_GROUP_SIZE, write_partition
+
+
+class DatasetSink(Sink):
+    """Копит батчи и пишет их в партицию source/crawl_date файлами по rows_per_file строк."""
+
+    def __init__(self, source: str, root: str = DEFAULT_DATASET_ROOT, crawl_date: Optional[str] = None,
+                 rows_per_file: int = DEFAULT_ROW_GROUP_SIZE * 10):
+        self.source = source
+        self.root = root
+        self.crawl_date = crawl_date or dt.date.today().isoformat()
+        self.rows_per_file = rows_per_file
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        self._buffer.extend(batch)
+        if len(self._buffer) >= self.rows_per_file:
+            self._flush()
+
+    def close_sync(self):
+        self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            write_partition(self._buffer, self.source, self.crawl_date, self.root)
+            self._buffer = []
@@ -0,0 +1,28 @@
+"""
+Module Description:
+Module writes streamed vacancy batches into a JSON Lines file.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import json
+from typing import Any, Dict, List
+
+from src.sinks.sink import Sink
+
+
+class JsonlSink(Sink):
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.writelines(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        self._file.flush()
+
+    def close_sync(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
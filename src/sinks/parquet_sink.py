@@ -0,0 +1,50 @@
+"""
+Module Description:
+Module writes streamed vacancy batches into a Parquet file, one row group per batch.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from typing import Any, Dict, List, Optional
+
+from src.sinks.sink import Sink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+class ParquetSink(Sink):
+    """
+    Колоночный файл результатов.
+
+    Схема фиксируется по первому батчу; колонки, которые в нём пустые, записываются строками.
+    """
+
+    def __init__(self, path: str, schema: Optional["pa.Schema"] = None, compression: str = "zstd"):
+        if pa is None:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow")
+        self.path = path
+        self.schema = schema
+        self.compression = compression
+        self._writer = None
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        if self.schema is None:
+            inferred = pa.Table.from_pylist(batch).schema
+            self.schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in inferred
+            ])
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self._writer.write_table(pa.Table.from_pylist(batch, schema=self.schema))
+
+    def close_sync(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
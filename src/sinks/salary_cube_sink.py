@@ -0,0 +1,20 @@
+"""
+Module Description:
+Module feeds streamed vacancy batches into the incremental salary cube.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from typing import Any, Dict, List
+
+from src.pipeline.salary_cube import SalaryCube
+from src.sinks.sink import Sink
+
+
+class SalaryCubeSink(Sink):
+    def __init__(self, cube: SalaryCube, source: str):
+        self.cube = cube
+        self.source = source
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        self.cube.add_batch(batch, self.source)
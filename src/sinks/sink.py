@@ -0,0 +1,84 @@
+"""
+Module Description:
+Module defines the base sink for streamed vacancy batches and the pump that feeds sinks from a source.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Sequence
+
+from src.sources.source import DEFAULT_BATCH_SIZE, Source
+
+log = logging.getLogger(__name__)
+
+
+class Sink:
+    """Потребитель батчей из Source.stream(); блокирующая запись выполняется в отдельном потоке."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def write(self, batch: List[Dict[str, Any]]):
+        await asyncio.to_thread(self.write_batch, batch)
+
+    async def close(self):
+        await asyncio.to_thread(self.close_sync)
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def close_sync(self):
+        pass
+
+
+async def stream_to(
+        source: Source,
+        sinks: Sequence[Sink],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_pending_batches: int = 4
+) -> int:
+    """
+    Перекачивает батчи источника во все sinks и возвращает число записей.
+
+    Между обходом и записью стоит очередь на max_pending_batches батчей: обход продолжается,
+    пока пишется предыдущий батч, но если sinks не успевают, обход останавливается.
+    """
+    queue = asyncio.Queue(maxsize=max_pending_batches)
+    written = 0
+
+    async def consume():
+        nonlocal written
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            await asyncio.gather(*[sink.write(batch) for sink in sinks])
+            written += len(batch)
+
+    async def put(item):
+        # Если запись упала, consumer завершится и не заберёт батч - не ждём его вечно
+        putter = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({putter, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if not putter.done():
+            putter.cancel()
+            consumer.result()
+
+    consumer = asyncio.create_task(consume())
+    try:
+        async for batch in source.stream(batch_size):
+            await put(batch)
+        await put(None)
+        await consumer
+    finally:
+        if not consumer.done():
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        for sink in sinks:
+            await sink.close()
+    log.info(f"Streamed {written} records of {type(source).__name__} into {len(sinks)} sinks")
+    return written
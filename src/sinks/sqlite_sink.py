@@ -0,0 +1,28 @@
+"""
+Module Description:
+Module upserts streamed vacancy batches into the shared SQLite vacancy store.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from typing import Any, Dict, List
+
+from src.sinks.sink import Sink
+from src.storage.vacancy_store import VacancyStore
+
+
+class SqliteSink(Sink):
+    def __init__(self, store: VacancyStore, source: str, id_field: str):
+        self.store = store
+        self.source = source
+        self.id_field = id_field
+
+    async def write(self, batch: List[Dict[str, Any]]):
+        # Соединение VacancyStore используется из потока event loop, как и в источниках
+        self.write_batch(batch)
+
+    async def close(self):
+        pass
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        self.store.upsert(self.source, batch, self.id_field)
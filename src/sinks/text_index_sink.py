@@ -0,0 +1,20 @@
+"""
+Module Description:
+Module feeds streamed vacancy batches into the full-text index.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from typing import Any, Dict, List
+
+from src.pipeline.text_index import TextIndex
+from src.sinks.sink import Sink
+
+
+class TextIndexSink(Sink):
+    def __init__(self, index: TextIndex, source: str):
+        self.index = index
+        self.source = source
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        self.index.add_batch(batch, self.source)
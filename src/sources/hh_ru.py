@@ -5,123 +5,288 @@ This module performs XYZ functionality.
 Author: Denis Makukh
 Date: 28.02.2025
 """
+import asyncio
 import logging
+import re
 import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
 from src.sources.source import Source
+from src.storage.vacancy_store import VacancyStore
+from src.storage.work_queue import Lease
+from src.utils.crawl_progress import Watermarks
+from src.utils.driver_pool import DriverPool
+from src.utils.hh_extractor import HHExtractor
+from src.utils.metrics import endpoint_of
+from src.utils.tasks import gather_or_cancel
 
 log = logging.getLogger(__name__)
 
+HTTP_MODE = "http"
+BROWSER_MODE = "browser"
+
+# Порядок выдачи: полный обход - по релевантности, инкрементальный - от новых к старым
+ORDER_RELEVANCE = "relevance"
+ORDER_NEWEST = "publication_time"
+
+# Наибольший ID роли, найденный страницами общей очереди; становится отметкой, когда выполнены все страницы роли
+PENDING_WATERMARK_PREFIX = "pending_watermark:"
+
+_VACANCY_ID_RE = re.compile(r"/vacancy/(\d+)")
+_CARD_MARKER = 'data-qa="serp-item__title"'
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/129.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+}
+
 
 class HHRuSource(Source):
-    def __init__(self):
-        options = webdriver.ChromeOptions()
-        # options.add_argument("--headless")  # Запуск без интерфейса для скорости
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    SOURCE_NAME = "hh_ru"
+    cache_ttl = 3600.0
+
+    def __init__(
+            self,
+            mode: str = HTTP_MODE,
+            base_url: str = "https://hh.ru",
+            browser_fallback: bool = True,
+            parse_workers: Optional[int] = None,
+            store: Optional[VacancyStore] = None,
+            incremental: bool = True,
+            browsers: int = 2,
+            pages_per_browser: int = 50,
+            headless: bool = True,
+            **client_options
+    ):
+        super().__init__(**client_options)
+        self.store = store or VacancyStore()
+        # Для ролей с отметкой забирать только вакансии новее самой новой сохранённой; False - полный обход
+        self.incremental = incremental
+        self.watermarks = Watermarks()
+        self.mode = mode
+        self.browser_fallback = browser_fallback
+        # Браузеры запускаются только при первой странице, которой нужен JavaScript
+        self.browsers = DriverPool(size=browsers, pages_per_driver=pages_per_browser, headless=headless)
+        self.extractor = HHExtractor(workers=parse_workers)
 
         # Базовый URL для парсинга
-        self.BASE_URL = "https://hh.ru/search/vacancy?text=&professional_role={role}&enable_snippets=true&order_by=relevance&items_on_page=100&page={page}"
+        self.BASE_URL = base_url + "/search/vacancy?text=&professional_role={role}&enable_snippets=true&order_by={order}&items_on_page=100&page={page}"
+        self.host = urlsplit(base_url).netloc
         self.roles = [156, 10, 150, 165, 73, 96, 164, 107, 148, 126, 124]
+        self.rate_limiter.configure(self.host, rate=1.0, max_rate=2.0)
 
     async def search(self) -> pd.DataFrame:
-        log.info("Parsing hh.ru source")
+        log.info(f"Parsing hh.ru source in {self.mode} mode")
         start_time = time.time()
-        all_vacancies = []
+        total = 0
 
         try:
-            for role in self.roles:
-                log.info("Current role: {}".format(role))
-                total_pages = self.get_num_of_pages(role)
-                log.info("Total pages: {}".format(total_pages))
-                for page in range(total_pages):
-                    vacancies = self.parse_vacancies(role, page)
-                    log.info("Vacancies found in page: {}".format(vacancies))
-                    if not vacancies:
-                        break
-                    all_vacancies.extend(vacancies)
-
-            df = pd.DataFrame(all_vacancies)
-            df.to_csv("hh_ru_vacancies.csv", index=False, encoding="utf-8-sig")
+            # Карточки сохраняются в хранилище в _extract_page, здесь они только считаются
+            async for vacancies in self.stream():
+                total += len(vacancies)
+
+            # В инкрементальном режиме поток - только новые вакансии, выгрузка же собирается из всего хранилища
+            df = pd.DataFrame.from_records(self.store.iter_records(self.SOURCE_NAME))
+            df.to_csv(self.output_path("hh_ru_vacancies.csv"), index=False, encoding="utf-8-sig")
             log.info("Vacancies parsed in {} seconds".format(time.time() - start_time))
             print(df.head())
             return df
         finally:
-            self.driver.quit()
-            print(f"Всего вакансий: {len(all_vacancies)}")
+            self.browsers.close()
+            self.extractor.close()
+            print(f"Всего вакансий: {total}")
             print(f"Время выполнения: {time.time() - start_time:.2f} секунд")
 
-    def get_num_of_pages(self, role):
-        """Определяет количество страниц вакансий для роли"""
-        self.driver.get(self.BASE_URL.format(role=role, page=0))
-        time.sleep(1.5)
-        self.scroll_to_bottom()
+    async def close(self):
+        self.browsers.close()
+        self.extractor.close()
+        await super().close()
+
+    async def _iter_records(self) -> AsyncIterator[Dict[str, Any]]:
+        async for vacancy in self._iter_queue(self._crawl, maxsize=1000):
+            yield vacancy
+
+    async def _crawl(self, queue: asyncio.Queue):
+        self.watermarks = Watermarks.load(self.store, self.SOURCE_NAME) if self.incremental else Watermarks()
+        if self.work_queue is not None:
+            await self._crawl_units(queue)
+            return
+        await gather_or_cancel(*[self._crawl_role(role, queue) for role in self.roles])
+
+    async def _crawl_units(self, queue: asyncio.Queue):
+        """
+        Пары (роль, страница) - единицы общей очереди. Единица первой страницы роли узнаёт число страниц
+        и ставит в очередь остальные; роль с отметкой обходится инкрементально целиком в одной единице.
+        """
+        self.work_queue.enqueue(self.SOURCE_NAME, [(f"{role}:0", {"role": role, "page": 0}) for role in self.roles])
+
+        async def crawl_unit(lease: Lease):
+            role, page = lease.payload["role"], lease.payload["page"]
+            if page == 0 and self.watermarks.get(role) is not None:
+                await self._crawl_role_new(role, queue)
+                return
+            html = await self._fetch_page(role, page)
+            if page == 0:
+                total_pages = await self.extractor.extract_num_of_pages(html)
+                self.work_queue.enqueue(self.SOURCE_NAME, [
+                    (f"{role}:{other}", {"role": role, "page": other}) for other in range(1, total_pages)
+                ])
+            for vacancy in await self._extract_page(role, page, html, lease):
+                await queue.put(vacancy)
+
+        await self.work_queue.run(self.SOURCE_NAME, crawl_unit, concurrency=self.max_connections_per_host)
+
+    async def _crawl_role(self, role, queue: asyncio.Queue):
+        """Забирает все страницы роли: первая страница даёт число страниц, остальные запрашиваются параллельно"""
+        log.info("Current role: {}".format(role))
+        if self.watermarks.get(role) is not None:
+            await self._crawl_role_new(role, queue)
+            return
+
+        newest = []
+        first_page = await self._fetch_page(role, 0)
+        total_pages = await self.extractor.extract_num_of_pages(first_page)
+        log.info("Total pages for role {}: {}".format(role, total_pages))
+
+        async def crawl_page(page, html=None):
+            html = html if html is not None else await self._fetch_page(role, page)
+            vacancies = await self._extract_page(role, page, html)
+            newest.append(newest_vacancy_id(vacancies))
+            for vacancy in vacancies:
+                await queue.put(vacancy)
+
+        await gather_or_cancel(crawl_page(0, first_page), *[crawl_page(page) for page in range(1, total_pages)])
+        self._save_watermark(role, max(filter(None, newest), default=None))
 
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
-        pages = soup.find_all("a", {"data-qa": "pager-page"})
-        return int(pages[-1].get_text(strip=True)) if pages else 1
+    async def _crawl_role_new(self, role, queue: asyncio.Queue):
+        """
+        Инкрементальный обход роли: страницы от новых к старым по одной, пока на странице есть
+        вакансии новее отметки. ID вакансий hh.ru растут со временем, поэтому отметка - наибольший ID.
+        """
+        since = self.watermarks.get(role)
+        newest = since
+        page, total_pages = 0, 1
+        while page < total_pages:
+            fetched = page + 1
+            html = await self._fetch_page(role, page, order=ORDER_NEWEST)
+            if page == 0:
+                total_pages = await self.extractor.extract_num_of_pages(html)
+            vacancies = await self._extract_page(role, page, html)
+            fresh = [vacancy for vacancy in vacancies if (vacancy_id_of(vacancy) or 0) > since]
+            for vacancy in fresh:
+                await queue.put(vacancy)
+            newest = max(newest, newest_vacancy_id(fresh) or since)
+            if not fresh:
+                break
+            page += 1
+        log.info(f"Role {role}: {fetched} of {total_pages} pages fetched since vacancy {since}")
+        self._save_watermark(role, newest)
+
+    def _save_watermark(self, role, newest: Optional[int]):
+        """Отметка пишется после всех страниц роли: вакансии к этому моменту уже сохранены в _extract_page."""
+        self.watermarks.advance(role, newest)
+        self.store.advance_watermarks(self.SOURCE_NAME, self.watermarks.checkpoint(role))
+
+    def _promote_watermark(self, role):
+        """
+        Отметка роли из общей очереди: записывается, только когда выполнены все страницы роли этого запуска.
+
+        Пока хоть одна страница не выполнена (в том числе после падения воркера или неудачи), роль
+        остаётся без новой отметки и следующий запуск обходит её полностью, а не только новые вакансии.
+        Проверку может пройти и несколько воркеров сразу - отметка только растёт, повтор безвреден.
+        """
+        if self.work_queue.unfinished(self.SOURCE_NAME, f"{role}:"):
+            return
+        newest = self.store.get_checkpoint(self.SOURCE_NAME, f"{PENDING_WATERMARK_PREFIX}{role}")
+        if newest is not None:
+            self._save_watermark(role, int(newest))
+
+    async def get_num_of_pages(self, role):
+        """Определяет количество страниц вакансий для роли"""
+        return await self.extractor.extract_num_of_pages(await self._fetch_page(role, 0))
 
-    def parse_vacancies(self, role, page):
+    async def parse_vacancies(self, role, page):
         """Парсит вакансии с одной страницы"""
-        self.driver.get(self.BASE_URL.format(role=role, page=page))
-        time.sleep(1)
-        self.scroll_to_bottom()
-
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
-        vacancy_elements = soup.find_all("div", class_="magritte-redesign")
-        vacancies = []
-
-        for vacancy in vacancy_elements:
-            title_tag = vacancy.find("a", {"data-qa": "serp-item__title"})
-            title = title_tag.get_text(strip=True) if title_tag else "Не указано"
-            link = title_tag["href"] if title_tag else ""
-
-            location_tag = vacancy.find("span", {"data-qa": "vacancy-serp__vacancy-address"})
-            location = location_tag.get_text(strip=True) if location_tag else "Не указано"
-
-            salary_tag = vacancy.find("span", {
-                "class": "magritte-text___pbpft_3-0-27 magritte-text_style-primary___AQ7MW_3-0-27 magritte-text_typography-label-1-regular___pi3R-_3-0-27"})
-            salary = salary_tag.get_text() if salary_tag else "Не указано"
-            if salary != "Не указано":
-                salary = salary.replace("\u202f", " ")
-                salary = salary.replace("\xa0до вычета налогов", " до вычета налогов")
-
-            company_tag = vacancy.find("span", {"data-qa": "vacancy-serp__vacancy-employer-text"})
-            company = company_tag.get_text(strip=True) if company_tag else "Не указано"
-
-            description_tag = vacancy.find("div", {"data-qa": "vacancy-serp__vacancy_snippet_responsibility"})
-            description = description_tag.get_text(strip=True) if description_tag else "Не указано"
-
-            requirements_tag = vacancy.find("div", {"data-qa": "vacancy-serp__vacancy_snippet_requirement"})
-            requirements = requirements_tag.get_text(strip=True) if requirements_tag else "Не указано"
-
-            experience_tag = vacancy.find("div", class_="magritte-tag__label___YHV-o_3-1-3")
-            experience = experience_tag.get_text(strip=True) if experience_tag else "Не указано"
-
-            vacancies.append({
-                "role_id": role,
-                "title": title,
-                "link": link,
-                "location": location,
-                "salary": salary,
-                "company": company,
-                "experience": experience,
-                "description": description,
-                "requirements": requirements
-            })
+        return await self._extract_page(role, page, await self._fetch_page(role, page))
 
+    async def _extract_page(self, role, page, html, lease: Optional[Lease] = None):
+        """
+        Разбирает и сохраняет страницу. Страница из общей очереди завершает аренду и копит кандидата
+        в отметку роли; отметкой он становится только после последней страницы роли, см. _promote_watermark.
+        """
+        vacancies = await self.extractor.extract_vacancies(html, role)
+        # Ключ вакансии - ID из ссылки: сама ссылка содержит параметры отслеживания, разные для разных выдач
+        for vacancy in vacancies:
+            vacancy["vacancy_id"] = vacancy_id_of(vacancy)
+        log.info("Vacancies found for role {} on page {}: {}".format(role, page, len(vacancies)))
+        if lease is not None:
+            newest = newest_vacancy_id(vacancies)
+            self.store.upsert(self.SOURCE_NAME, vacancies, "vacancy_id",
+                              watermarks={f"{PENDING_WATERMARK_PREFIX}{role}": newest} if newest else None,
+                              lease=lease)
+            self._promote_watermark(role)
+        elif vacancies:
+            self.store.upsert(self.SOURCE_NAME, vacancies, "vacancy_id")
         return vacancies
 
-    def scroll_to_bottom(self):
-        """Плавная прокрутка страницы вниз для подгрузки вакансий"""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        while True:
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1.5)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+    def _is_cacheable(self, content: bytes) -> bool:
+        """
+        Кешируются только страницы с карточками: страница-заглушка, капча или выдача, отрендеренная на JS,
+        иначе до истечения cache_ttl отправляла бы каждый следующий запуск в браузер.
+        """
+        return _CARD_MARKER.encode() in content
+
+    async def _fetch_page(self, role, page, order: str = ORDER_RELEVANCE) -> str:
+        """Возвращает HTML страницы выдачи: по HTTP, а через браузер - только если без JS карточек нет"""
+        url = self.BASE_URL.format(role=role, page=page, order=order)
+        if self.mode == BROWSER_MODE:
+            return await self._load_page(url)
+
+        html = await self.make_request("GET", url, headers=BROWSER_HEADERS)
+        if self.browser_fallback and not has_vacancy_cards(html):
+            log.warning(f"No vacancy cards in raw HTML of {url}, falling back to browser")
+            return await self._load_page(url)
+        return html
+
+    async def _load_page(self, url) -> str:
+        """
+        Открывает страницу в браузере из пула с учётом лимита запросов к hh.ru.
+
+        Страницы всех ролей делят пул: каждая занимает первый освободившийся браузер,
+        а готовой считается, как только карточки вакансий отрисованы.
+        """
+        await self.rate_limiter.acquire(self.host)
+        endpoint = f"browser:{endpoint_of(url)}"
+        started = time.perf_counter()
+        try:
+            html = await self.browsers.load(url)
+        except Exception:
+            self.metrics.error(self.SOURCE_NAME, endpoint, time.perf_counter() - started)
+            raise
+        # Время страницы - ожидание браузера, загрузка и отрисовка карточек
+        self.metrics.observe(self.SOURCE_NAME, endpoint, "browser", time.perf_counter() - started,
+                             len(html.encode("utf-8")))
+        return html
+
+
+def vacancy_id_of(vacancy: Dict[str, Any]) -> Optional[int]:
+    """ID вакансии из ссылки карточки: https://hh.ru/vacancy/<id>?..."""
+    if vacancy.get("vacancy_id") is not None:
+        return vacancy["vacancy_id"]
+    match = _VACANCY_ID_RE.search(vacancy.get("link") or "")
+    return int(match.group(1)) if match else None
+
+
+def newest_vacancy_id(vacancies: Iterable[Dict[str, Any]]) -> Optional[int]:
+    return max(filter(None, map(vacancy_id_of, vacancies)), default=None)
+
+
+def has_vacancy_cards(html: str) -> bool:
+    """Быстрая проверка, что в HTML уже есть отрендеренные карточки вакансий"""
+    return _CARD_MARKER in html
+
@@ -1,84 +1,239 @@
+import asyncio
 import os
 import logging
 import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
 import pandas as pd
 
-from src.config import RABOTA_RU_APP_ID, RABOTA_RU_CODE_TOKEN, RABOTA_RU_APP_SECRET
+from src.config import get_setting
 from src.sources.source import Source
-from src.utils.rabota_ru_mapper import parse_json_list_to_dataframe
+from src.storage.vacancy_store import VacancyStore
+from src.storage.work_queue import Lease
+from src.utils.crawl_progress import ContiguousCheckpoint, WorkerStats
+from src.utils.id_space import DEFAULT_BLOCK_SIZE, IdBitmap, SparseIdProber
+from src.utils.records import RabotaRuVacancy, rabota_ru_frame
 from src.utils.signature import get_signature
+from src.utils.tasks import gather_or_cancel
 
 log = logging.getLogger(__name__)
 
+# Ответы API, означающие, что вакансии с таким ID нет (удалена или не существовала)
+MISSING_STATUSES = {404, 410}
+MISSES_BITMAP = "misses"
+
 
 class RabotaRuSource(Source):
-    def __init__(self):
-        self.output_file = "rabota_ru_vacancies_1.csv"
-        self.checkpoint_file = "checkpoint_1.txt"
+    SOURCE_NAME = "rabota_ru"
+    cache_ttl = 24 * 3600.0
+
+    def __init__(self, concurrency: int = 10, checkpoint_every: int = 10, store: Optional[VacancyStore] = None,
+                 start_id: int = 46955330, end_id: Optional[int] = None, base_url: str = "https://api.rabota.ru",
+                 incremental: bool = True, unit_size: int = DEFAULT_BLOCK_SIZE, **client_options):
+        super().__init__(**client_options)
+        self.output_file = self.output_path("rabota_ru_vacancies_1.csv")
+        self.legacy_checkpoint_file = "checkpoint_1.txt"
+        self.store = store or VacancyStore()
+        self.start_id = start_id
+        # True - продолжить с сохранённого next_id (отметка rabota.ru), False - пройти диапазон заново
+        self.incremental = incremental
+        # None - верхняя граница определяется по ходу обхода, см. SparseIdProber
+        self.end_id = end_id
+        self.concurrency = concurrency
+        self.checkpoint_every = checkpoint_every
+        # Размер диапазона ID - единицы общей очереди; кратен блоку битовой карты промахов,
+        # чтобы каждый блок карты принадлежал одной единице и процессы не затирали блоки друг друга
+        self.unit_size = max(unit_size // DEFAULT_BLOCK_SIZE, 1) * DEFAULT_BLOCK_SIZE
+        self.worker_stats: List[WorkerStats] = []
+        self._pending: List[RabotaRuVacancy] = []
+        self.prober: Optional[SparseIdProber] = None
+        self.base_url = base_url
+        self.rate_limiter.configure(urlsplit(base_url).netloc, rate=5.0, max_rate=20.0)
 
     async def search(self) -> pd.DataFrame:
+        async for _ in self.stream():
+            pass
+
+        df = rabota_ru_frame(RabotaRuVacancy.from_stored(record)
+                             for record in self.store.iter_records(self.SOURCE_NAME))
+        df.to_csv(self.output_file, index=False)
+        log.info("Parsing completed and data saved successfully")
+
+        return df
+
+    async def _iter_records(self) -> AsyncIterator[RabotaRuVacancy]:
+        async for vacancy in self._iter_queue(self._crawl, maxsize=self.concurrency * 4):
+            yield vacancy
+
+    def _map_batch(self, batch: List[RabotaRuVacancy]) -> List[Dict[str, Any]]:
+        return [vacancy.to_dict() for vacancy in batch]
+
+    async def _crawl(self, queue: asyncio.Queue):
         log.info("Parsing rabota.ru source")
+        if self.work_queue is not None:
+            await self._crawl_units(queue)
+            return
 
-        if os.path.exists(self.output_file):
-            log.info("Loading existing vacancies from file")
-            df = pd.read_csv(self.output_file)
-            vacancies = df.to_dict("records")
-        else:
-            vacancies = []
+        last_processed_id = self._load_checkpoint()
+        log.info(f"Resuming from id {last_processed_id}, {self.store.count(self.SOURCE_NAME)} vacancies stored")
 
-        if os.path.exists(self.checkpoint_file):
-            with open(self.checkpoint_file, "r") as f:
-                last_processed_id = int(f.read().strip())
-        else:
-            last_processed_id = 46955330
+        token = await self._get_auth_token()
+
+        checkpoint = ContiguousCheckpoint(last_processed_id)
+        upper_bound = self._load_upper_bound()
+        misses = IdBitmap(blocks=self.store.load_bitmap(self.SOURCE_NAME, MISSES_BITMAP))
+        # Хранилища прошлых версий записывали в промахи и ещё не выданные ID выше границы
+        misses.discard_from(upper_bound if upper_bound is not None else last_processed_id)
+        self.prober = SparseIdProber(
+            last_processed_id,
+            self.end_id,
+            misses=misses,
+            checkpoint=checkpoint,
+            known_upper_bound=upper_bound,
+        )
+        self.worker_stats = [WorkerStats(worker_id) for worker_id in range(self.concurrency)]
+        log.info(f"Crawling ids from {last_processed_id} to {self.end_id or 'the discovered upper bound'} "
+                 f"with {self.concurrency} workers")
+
+        try:
+            await gather_or_cancel(*[
+                self._worker(token, self.prober, checkpoint, stats, queue) for stats in self.worker_stats
+            ])
+        finally:
+            # При ошибке или отмене (Ctrl-C, бюджет времени) воркеры уже остановлены - сохраняем обработанное
+            self._flush(self.prober.resume_point())
+            for stats in self.worker_stats:
+                log.info(f"rabota.ru {stats}")
+            log.info(f"rabota.ru id space: {self.prober.stats()}")
+
+    async def _crawl_units(self, queue: asyncio.Queue):
+        """
+        Диапазоны ID по unit_size - единицы общей очереди. Диапазон обходится целиком и сохраняется
+        одной транзакцией вместе с его промахами и завершением аренды.
+        """
+        end_id = self.end_id
+        if end_id is None:
+            upper_bound = self._load_upper_bound()
+            if upper_bound is None:
+                raise ValueError("Sharded rabota.ru crawl needs end_id or an upper bound found by an earlier crawl")
+            # Как и SparseIdProber, ищем новые вакансии на horizon ID выше последней найденной. Конец
+            # выравнивается на unit_size: процессы, прочитавшие разные upper_bound, получают те же ключи
+            # диапазонов (лишь больше или меньше их), а не пересекающиеся хвосты вида X-100500 и X-100800
+            end_id = -(-(upper_bound + SparseIdProber(self.start_id).horizon) // self.unit_size) * self.unit_size
 
         token = await self._get_auth_token()
+        bounds = [self.start_id, *range((self.start_id // self.unit_size + 1) * self.unit_size, end_id,
+                                        self.unit_size), end_id]
+        self.work_queue.enqueue(self.SOURCE_NAME, [
+            (f"{start}-{end}", {"start": start, "end": end}) for start, end in zip(bounds, bounds[1:])
+        ])
 
-        for idx in range(last_processed_id, 46960440):
-            try:
-                log.info(f"Parsing vacancy for id: {idx}")
-                response = await self._get_vacancy(token, idx)
-                vacancy = response['response']
-                vacancies.append(vacancy)
+        async def crawl_range(lease: Lease):
+            start, end = lease.payload["start"], lease.payload["end"]
+            checkpoint = ContiguousCheckpoint(start)
+            prober = SparseIdProber(
+                start, end,
+                misses=IdBitmap(blocks=self.store.load_bitmap(self.SOURCE_NAME, MISSES_BITMAP)),
+                checkpoint=checkpoint,
+                known_upper_bound=self._load_upper_bound(),
+            )
+            self._pending = []
+            self.worker_stats = [WorkerStats(worker_id) for worker_id in range(self.concurrency)]
+            await gather_or_cancel(*[
+                self._worker(token, prober, checkpoint, stats, queue, flush=False) for stats in self.worker_stats
+            ])
+            pending, self._pending = self._pending, []
+            errors = sum(stats.errors for stats in self.worker_stats)
+            # Верхняя граница только растёт: диапазоны завершаются в любом порядке
+            watermarks = {"upper_bound": prober.upper_bound} if prober.upper_bound is not None else None
+            # Диапазон с ошибками сохраняет найденное, но аренду не завершает: run() вернёт его в очередь,
+            # и повторная попытка запросит только ID с ошибками и найденные вакансии - промахи уже в карте
+            self.store.upsert(self.SOURCE_NAME, [vacancy.to_dict() for vacancy in pending], "id",
+                              bitmaps={MISSES_BITMAP: prober.misses.dirty_blocks()}, watermarks=watermarks,
+                              lease=None if errors else lease)
+            log.info(f"rabota.ru range {lease.key}: {prober.stats()}")
+            if errors:
+                raise RuntimeError(f"{errors} IDs in rabota.ru range {lease.key} failed, range requeued")
 
-                if idx % 10 == 0:
-                    self._save_vacancies(vacancies)
-                    self._save_checkpoint(idx)
+        await self.work_queue.run(self.SOURCE_NAME, crawl_range)
 
+    async def _worker(self, token, prober: SparseIdProber, checkpoint: ContiguousCheckpoint, stats: WorkerStats,
+                      queue: asyncio.Queue, flush: bool = True):
+        """Забирает ID из общего итератора, пока диапазон не закончится; flush=False - без промежуточных сохранений."""
+        for idx in prober:
+            started = time.monotonic()
+            vacancy = None
+            found = None
+            try:
+                log.info(f"Parsing vacancy for id: {idx}")
+                vacancy = await self._get_vacancy(token, idx)
+                found = vacancy is not None
+                if found:
+                    self._pending.append(vacancy)
+                    stats.found += 1
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in MISSING_STATUSES:
+                    found = False
+                else:
+                    stats.errors += 1
+                    log.error(f"Error parsing vacancy for id: {idx}")
             except Exception as e:
+                stats.errors += 1
                 log.error(f"Error parsing vacancy for id: {idx}")
+            finally:
+                stats.processed += 1
+                stats.busy_seconds += time.monotonic() - started
 
-        self._save_vacancies(vacancies)
-        log.info("Parsing completed and data saved successfully")
+            prober.record(idx, found)
+            if vacancy is not None:
+                await queue.put(vacancy)
+            # ID с ошибкой (5xx, 429 после повторов, таймаут) остаётся ниже чекпоинта и будет запрошен
+            # при следующем запуске; завершённым считается только ID с ответом 200 или 404
+            if found is not None:
+                checkpoint.mark_done(idx)
+            if flush and stats.processed % self.checkpoint_every == 0:
+                self._flush(prober.resume_point())
 
-        return parse_json_list_to_dataframe(vacancies)
+    def _load_checkpoint(self) -> int:
+        """Возвращает ID, с которого нужно продолжить обход."""
+        if not self.incremental:
+            return self.start_id
+        value = self.store.get_checkpoint(self.SOURCE_NAME, "next_id")
+        if value is None and os.path.exists(self.legacy_checkpoint_file):
+            with open(self.legacy_checkpoint_file, "r") as f:
+                value = f.read().strip()
+        return int(value) if value is not None else self.start_id
 
-    def _save_vacancies(self, vacancies):
-        """Сохраняет текущие данные в файл."""
-        df = parse_json_list_to_dataframe(vacancies)
-        df.to_csv(self.output_file, index=False)
-        log.info(f"Vacancies saved to {self.output_file}")
+    def _load_upper_bound(self) -> Optional[int]:
+        value = self.store.get_checkpoint(self.SOURCE_NAME, "upper_bound")
+        return int(value) if value is not None else None
 
-    def _save_checkpoint(self, last_id):
-        """Сохраняет последний обработанный ID в файл."""
-        with open(self.checkpoint_file, "w") as f:
-            f.write(str(last_id))
-        log.info(f"Checkpoint saved: last processed ID = {last_id}")
+    def _flush(self, next_id: int):
+        """Дописывает накопленные вакансии, чекпоинт и новые промахи в хранилище одной транзакцией."""
+        pending, self._pending = self._pending, []
+        checkpoint = {"next_id": next_id}
+        if self.prober.upper_bound is not None:
+            checkpoint["upper_bound"] = self.prober.upper_bound
+        self.store.upsert(self.SOURCE_NAME, [vacancy.to_dict() for vacancy in pending], "id", checkpoint=checkpoint,
+                          bitmaps={MISSES_BITMAP: self.prober.misses.dirty_blocks()})
+        log.info(f"Checkpoint saved: all IDs below {next_id} processed")
 
     async def _get_auth_token(self) -> str:
         log.info("Getting rabota.ru auth token")
 
-        url = "https://api.rabota.ru/oauth/token.json"
+        url = self.base_url + "/oauth/token.json"
 
         current_time = str(int(time.time()))
 
         params = {
-            "app_id": RABOTA_RU_APP_ID,
+            "app_id": get_setting("RABOTA_RU_APP_ID"),
             "time": current_time,
-            "code": RABOTA_RU_CODE_TOKEN,
+            "code": get_setting("RABOTA_RU_CODE_TOKEN"),
         }
 
-        signature = get_signature(params, RABOTA_RU_APP_SECRET)
+        signature = get_signature(params, get_setting("RABOTA_RU_APP_SECRET"))
 
         data = {**params, "signature": signature}
 
@@ -91,6 +246,7 @@ class RabotaRuSource(Source):
             url=url,
             headers=headers,
             body=data,
+            use_cache=False,
         )
 
         if "access_token" in response:
@@ -103,19 +259,20 @@ class RabotaRuSource(Source):
     async def _get_auth_permission(self):
         log.info("Getting rabota.ru auth permission")
         params = {
-            "app_id": RABOTA_RU_APP_ID,
+            "app_id": get_setting("RABOTA_RU_APP_ID"),
             "scope": "profile,vacancies",
             "display": "page",
             "redirect_uri": "http://www.example.com/oauth"
         }
 
-        url = "https://api.rabota.ru/oauth/authorize.html"
-        response = await self.make_request(url=url, method="GET", params=params)
+        url = self.base_url + "/oauth/authorize.html"
+        response = await self.make_request(url=url, method="GET", params=params, use_cache=False)
         return response
 
-    async def _get_vacancy(self, token, id: int):
+    async def _get_vacancy(self, token, id: int) -> Optional[RabotaRuVacancy]:
+        """Возвращает вакансию, разобранную сразу из байт ответа, или None, если в ответе её нет."""
         log.info("Getting rabota.ru vacancy")
-        url = "https://api.rabota.ru/v6/vacancy.json"
+        url = self.base_url + "/v6/vacancy.json"
 
         headers = {
             "Content-Type": "application/json",
@@ -128,5 +285,5 @@ class RabotaRuSource(Source):
             }
         }
 
-        response = await self.make_request("POST", url, headers=headers, body=json)
-        return response
+        content = await self.make_request("POST", url, headers=headers, body=json, raw=True)
+        return RabotaRuVacancy.from_response(content)
@@ -0,0 +1,69 @@
+"""
+Module Description:
+Module declares the available sources by name as "module:Class" paths and imports a source's module
+(with its heavy dependencies: pandas, bs4, selenium) only when the source is first looked up.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import importlib
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Type
+
+if TYPE_CHECKING:
+    from src.sources.source import Source
+
+log = logging.getLogger(__name__)
+
+SOURCE_PATHS: Dict[str, str] = {
+    "hh_ru": "src.sources.hh_ru:HHRuSource",
+    "rabota_ru": "src.sources.rabota_ru:RabotaRuSource",
+    "superjob_ru": "src.sources.super_job_ru:SuperJobSource",
+}
+
+
+class SourceRegistry(Mapping[str, Type["Source"]]):
+    """
+    Отображение имя источника -> класс, импортирующее класс при первом обращении по имени.
+
+    Проверка имени (name in registry), перебор и sorted(registry) модули источников не импортируют,
+    поэтому запуск одного источника не платит за зависимости остальных.
+    """
+
+    def __init__(self, paths: Mapping[str, str]):
+        self._paths = dict(paths)
+        self._classes: Dict[str, Type["Source"]] = {}
+
+    def register(self, name: str, path: str):
+        """Добавляет источник по пути "module:Class"."""
+        self._paths[name] = path
+        self._classes.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._classes
+
+    def __getitem__(self, name: str) -> Type["Source"]:
+        source_class = self._classes.get(name)
+        if source_class is None:
+            module_name, _, class_name = self._paths[name].partition(":")
+            started = time.perf_counter()
+            source_class = getattr(importlib.import_module(module_name), class_name)
+            if source_class.SOURCE_NAME != name:
+                raise ValueError(f"Source {self._paths[name]} is registered as {name!r} "
+                                 f"but named {source_class.SOURCE_NAME!r}")
+            log.info(f"Source {name} loaded in {time.perf_counter() - started:.2f}s")
+            self._classes[name] = source_class
+        return source_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
+
+
+SOURCES = SourceRegistry(SOURCE_PATHS)
@@ -5,21 +5,157 @@ This module performs XYZ functionality.
 Author: Denis Makukh
 Date: 27.02.2025
 """
+import asyncio
 import logging
-from typing import Optional, Dict, Any, Union
+import os
+import time
+from typing import Optional, Dict, Any, Union, AsyncIterator, Awaitable, Callable, List
+from urllib.parse import urlsplit
 
 import httpx
 import pandas as pd
 
+from src.storage.http_cache import HttpCache, make_cache_key
+from src.storage.work_queue import WorkQueue
+from src.utils.json_codec import loads
+from src.utils.metrics import RequestMetrics, default_metrics, endpoint_of
+from src.utils.rate_limiter import AdaptiveRateLimiter, THROTTLE_STATUSES, default_rate_limiter
+
 log = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 10
+DEFAULT_BATCH_SIZE = 500
+
 
 class Source:
+    SOURCE_NAME = "source"
+    # Время жизни закешированных ответов источника, секунды
+    cache_ttl: float = 3600.0
+
+    def __init__(
+            self,
+            max_connections: int = DEFAULT_MAX_CONNECTIONS,
+            max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+            max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+            timeout: float = 60.0,
+            rate_limiter: Optional[AdaptiveRateLimiter] = None,
+            max_retries: int = 3,
+            cache: Optional[HttpCache] = None,
+            cache_ttl: Optional[float] = None,
+            output_dir: str = ".",
+            metrics: Optional[RequestMetrics] = None,
+            work_queue: Optional[WorkQueue] = None
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.max_retries = max_retries
+        self.cache = cache
+        if cache_ttl is not None:
+            self.cache_ttl = cache_ttl
+        self.output_dir = output_dir
+        self.metrics = metrics or default_metrics
+        # Общая очередь единиц работы: обход делится между процессами, запущенными с тем же run_id
+        self.work_queue = work_queue
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
     async def search(
             self
     ) -> pd.DataFrame:
         raise NotImplementedError
 
+    async def stream(self, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Отдаёт результаты обхода батчами не больше batch_size записей по мере их поступления.
+
+        Пока потребитель обрабатывает батч, обход дальше не продвигается, поэтому память не растёт.
+        """
+        batch = []
+        async for record in self._iter_records():
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield self._map_batch(batch)
+                batch = []
+        if batch:
+            yield self._map_batch(batch)
+
+    async def _iter_records(self) -> AsyncIterator[Any]:
+        """Сырые записи источника по одной; реализуется в наследниках."""
+        raise NotImplementedError
+        yield
+
+    def _map_batch(self, batch: List[Any]) -> List[Dict[str, Any]]:
+        """Превращает сырые записи батча в плоские строки результата."""
+        return batch
+
+    async def _iter_queue(self, producer: Callable[[asyncio.Queue], Awaitable[None]],
+                          maxsize: int) -> AsyncIterator[Any]:
+        """
+        Запускает producer(queue) и отдаёт элементы очереди, пока он не завершится.
+
+        Очередь ограничена maxsize: если потребитель не успевает, producer ждёт на queue.put.
+        """
+        queue = asyncio.Queue(maxsize=maxsize)
+        task = asyncio.create_task(producer(queue))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    while not queue.empty():
+                        yield queue.get_nowait()
+                    task.result()
+                    return
+                yield getter.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def close(self):
+        """Закрывает общий HTTP-клиент источника."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_semaphores = {}
+            log.info(f"HTTP client of {type(self).__name__} closed")
+
+    def output_path(self, file_name: str) -> str:
+        """Путь к файлу результатов внутри output_dir источника."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, file_name)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Возвращает общий HTTP/2 клиент, создавая его при первом обращении."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(http2=True, limits=self.limits, timeout=self.timeout)
+            self._host_semaphores = {}
+        return self._client
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_semaphores[host]
+
     async def make_request(
             self,
             method: str,
@@ -27,17 +163,84 @@ class Source:
             headers: Optional[Dict[str, str]] = None,
             params: Optional[Dict[str, Any]] = None,
             body: Optional[Dict[str, Any]] = None,
-            timeout: float = 60.0
+            timeout: Optional[float] = None,
+            use_cache: bool = True,
+            raw: bool = False
     ) -> Union[Dict[str, Any], str, bytes]:
-        import httpx
+        """
+        Выполняет запрос через общий клиент с учётом лимита хоста и повторов на 429/5xx.
+
+        Если у источника есть кеш, ответы берутся из него до истечения cache_ttl, а устаревшие
+        записи ревалидируются по ETag/Last-Modified. Запросы токенов вызываются с use_cache=False.
+        В кеш попадают только ответы 200, прошедшие _is_cacheable.
+        При raw=True возвращаются байты тела ответа - вызывающий сам разбирает из них только нужные поля.
+        """
+        client = self._get_client()
+        timeout = timeout if timeout is not None else self.timeout
+        endpoint = endpoint_of(url)
+
+        cache_key, cached = None, None
+        if self.cache is not None and use_cache and self.cache_ttl > 0:
+            cache_key = make_cache_key(method, url, params, body, headers)
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached.is_fresh:
+                log.info(f"Cache hit for {method} {url}")
+                self.metrics.cache_hit(self.SOURCE_NAME, endpoint)
+                return cached.content if raw else self._decode(cached.headers.get("content-type", ""), cached.content)
+            if cached is not None and cached.validators:
+                headers = {**(headers or {}), **cached.validators}
+
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.max_retries + 1):
+            sent_at = await self.rate_limiter.acquire(host)
+            started = time.perf_counter()
+            try:
+                response = await self._send(client, method, url, headers, params, body, timeout)
+            except httpx.HTTPError:
+                self.metrics.error(self.SOURCE_NAME, endpoint, time.perf_counter() - started)
+                raise
+            self.metrics.observe(self.SOURCE_NAME, endpoint, response.status_code, time.perf_counter() - started,
+                                 len(response.content))
+            self.rate_limiter.on_response(host, response.status_code, response.headers.get("Retry-After"), sent_at)
+            if response.status_code not in THROTTLE_STATUSES or attempt == self.max_retries:
+                break
+            self.metrics.retry(self.SOURCE_NAME, endpoint)
+            log.warning(f"Retrying {method} {url} after {response.status_code} (attempt {attempt + 1})")
+
+        if cached is not None and response.status_code == 304:
+            log.info(f"Cached response for {method} {url} revalidated")
+            self.cache.refresh(cache_key, self.cache_ttl)
+            return cached.content if raw else self._decode(cached.headers.get("content-type", ""), cached.content)
+
+        response.raise_for_status()
 
-        async with httpx.AsyncClient(http2=True, timeout=timeout) as client:
+        if cache_key is not None and response.status_code == 200 and self._is_cacheable(response.content):
+            self.cache.put(cache_key, response.status_code, dict(response.headers), response.content, self.cache_ttl)
+
+        if raw:
+            return response.content
+        return self._decode(response.headers.get("Content-Type", ""), response.content)
+
+    def _is_cacheable(self, content: bytes) -> bool:
+        """Пустой ответ в кеш не кладётся; источники дополнительно отсеивают заглушки и капчу."""
+        return bool(content.strip())
+
+    @staticmethod
+    def _decode(content_type: str, content: bytes) -> Union[Dict[str, Any], str]:
+        if "application/json" in content_type.lower():
+            return loads(content)
+        else:
+            return content.decode("utf-8", errors="replace")
+
+    async def _send(self, client: httpx.AsyncClient, method, url, headers, params, body, timeout) -> httpx.Response:
+        async with self._get_host_semaphore(url):
             log.info(f"Requesting {method} {url}")
 
             content_type = headers.get("content-type", "").lower() if headers else ""
 
             if "application/x-www-form-urlencoded" in content_type:
-                response = await client.request(
+                return await client.request(
                     method,
                     url,
                     headers=headers,
@@ -46,7 +249,7 @@ class Source:
                     timeout=timeout
                 )
             else:
-                response = await client.request(
+                return await client.request(
                     method,
                     url,
                     headers=headers,
@@ -54,12 +257,3 @@ class Source:
                     json=body,
                     timeout=timeout
                 )
-
-            response.raise_for_status()
-
-            response_content_type = response.headers.get("Content-Type", "").lower()
-
-            if "application/json" in response_content_type:
-                return response.json()
-            else:
-                return response.text
@@ -5,28 +5,62 @@ This module performs XYZ functionality.
 Author: Denis Makukh
 Date: 28.02.2025
 """
+import asyncio
 import logging
-import time
+import math
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import pandas as pd
 
-from src.config import SUPERJOB_SECRET
+from src.config import get_setting
 from src.sources.source import Source
-from src.utils.superjob_mapper import extend_vacancies_from_response
+from src.storage.vacancy_store import VacancyStore
+from src.storage.work_queue import Lease
+from src.utils.crawl_progress import Watermarks
+from src.utils.superjob_mapper import COLUMNS, SuperJobColumns
+from src.utils.tasks import gather_or_cancel
 
 log = logging.getLogger(__name__)
 
 
 class SuperJobSource(Source):
-    def __init__(self):
-        self.base_url = "https://api.superjob.ru/2.0"
+    SOURCE_NAME = "superjob_ru"
+    cache_ttl = 3600.0
+
+    def __init__(self, store: Optional[VacancyStore] = None, base_url: str = "https://api.superjob.ru/2.0",
+                 incremental: bool = True, **client_options):
+        super().__init__(**client_options)
+        self.store = store or VacancyStore()
+        # Запрашивать только вакансии новее сохранённых отметок; False - полный обход
+        self.incremental = incremental
+        self.watermarks = Watermarks()
+        self.base_url = base_url
         self.default_headers = {
-            "X-Api-App-Id": SUPERJOB_SECRET
+            "X-Api-App-Id": get_setting("SUPERJOB_SECRET")
         }
+        self.rate_limiter.configure(urlsplit(base_url).netloc, rate=2.0, max_rate=5.0)
+        self.page_size = 100
+        self.max_results = 500
+        self.query_stats: Dict[str, Dict[str, int]] = {}
 
     async def search(self) -> pd.DataFrame:
+        async for _ in self.stream():
+            pass
+
+        # В инкрементальном режиме поток - только новые вакансии, выгрузка же собирается из всего хранилища
+        df = pd.DataFrame.from_records(self.store.iter_records(self.SOURCE_NAME), columns=list(COLUMNS))
+        df.to_csv(self.output_path("superjob_ru_vacancies.csv"), index=False)
+        log.info("successfully saved vacancies data")
+        return df
+
+    async def _iter_records(self) -> AsyncIterator[Dict[str, Any]]:
         log.info("Parsing superjob.ru source")
-        vacancies = []
+        seen_ids: Set[int] = set()
+        self.query_stats = {}
+        self.watermarks = Watermarks.load(self.store, self.SOURCE_NAME) if self.incremental else Watermarks()
+        if self.watermarks:
+            log.info(f"Incremental run: {len(self.watermarks)} queries have watermarks")
 
         # попарсим по ключевым словам
         keyword_to_find = [
@@ -56,55 +90,110 @@ class SuperJobSource(Source):
             "ar", "робототехника", "дроны", "электроника", "телеком", "связь", "телевидение",
             "радио", "кино", "фото", "соцсети", "стартап", "предприниматель", "фриланс", "удаленная работа"
         ]
-        for keyword in keyword_to_find:
-            response = await self._get_vacancy_by_keyword(keyword)
-            time.sleep(0.5)
-            extend_vacancies_from_response(response, vacancies)
-            log.info(f"New vacancies length: {len(vacancies)}")
-
-        # попарсим по деньгам
-        payment_order_response = await self._get_vacancy_by_salary_order()
-        time.sleep(0.5)
-        extend_vacancies_from_response(payment_order_response, vacancies)
-        log.info(f"New vacancies length: {len(vacancies)}")
-
-        # попарсим по москве
-        moscow_response = await self._get_vacancy_by_param("town", "Москва")
-        time.sleep(0.5)
-        extend_vacancies_from_response(moscow_response, vacancies)
-        log.info(f"New vacancies length: {len(vacancies)}")
-
-        df = pd.DataFrame(vacancies)
-        df.to_csv("superjob_ru_vacancies.csv", index=False)
-        log.info("successfully saved vacancies data")
-        return df
-
-    async def _get_vacancy_by_keyword(self, keyword):
-        log.info("Getting vacancies by keyword {}".format(keyword))
-
-        params = {"keyword": keyword}
-        endpoint = "/vacancies/"
-
-        response = await self.make_request("GET", self.base_url + endpoint, params=params,
-                                           headers=self.default_headers)
-        return response
-
-    async def _get_vacancy_by_salary_order(self):
-        log.info("Getting vacancies by salary order")
-
-        params = {"order_field": "payment"}
-        endpoint = "/vacancies/"
-
-        response = await self.make_request("GET", self.base_url + endpoint, params=params,
-                                           headers=self.default_headers)
-        return response
-
-    async def _get_vacancy_by_param(self, key, value):
-        log.info("Getting vacancies by kv")
-
-        params = {key: value}
-        endpoint = "/vacancies/"
-
-        response = await self.make_request("GET", self.base_url + endpoint, params=params,
-                                           headers=self.default_headers)
-        return response
+        queries: List[Tuple[str, Dict[str, Any]]] = [(keyword, {"keyword": keyword}) for keyword in keyword_to_find]
+        # попарсим по деньгам и по москве
+        queries += [("order_field=payment", {"order_field": "payment"}), ("town=Москва", {"town": "Москва"})]
+
+        if self.work_queue is not None:
+            async for vacancy in self._iter_queue(lambda queue: self._crawl_units(queries, seen_ids, queue),
+                                                  maxsize=self.page_size * 10):
+                yield vacancy
+        else:
+            for query, params in queries:
+                responses = await self._get_all_pages(params, query)
+                for vacancy in self._collect(query, responses, seen_ids):
+                    yield vacancy
+
+        unproductive = [query for query, stats in self.query_stats.items() if stats["new"] == 0]
+        if unproductive:
+            log.info(f"Queries without new vacancies: {unproductive}")
+
+    async def _crawl_units(self, queries: List[Tuple[str, Dict[str, Any]]], seen_ids: Set[int],
+                           queue: asyncio.Queue):
+        """Запросы - единицы общей очереди: каждый процесс берёт следующий свободный запрос."""
+        self.work_queue.enqueue(self.SOURCE_NAME, [(query, params) for query, params in queries])
+
+        async def crawl_query(lease: Lease):
+            responses = await self._get_all_pages(lease.payload, lease.key)
+            for vacancy in self._collect(lease.key, responses, seen_ids, lease):
+                await queue.put(vacancy)
+
+        await self.work_queue.run(self.SOURCE_NAME, crawl_query)
+
+    def _collect(self, query, responses, seen_ids, lease: Optional[Lease] = None) -> List[Dict[str, Any]]:
+        """
+        Возвращает новые вакансии из всех страниц запроса, сохраняет их и считает дубликаты.
+
+        Отметка запроса - самая поздняя date_published в выдаче - пишется в той же транзакции, что и вакансии,
+        как и завершение единицы очереди, если запрос выполнялся по аренде.
+        """
+        stats = self.query_stats.setdefault(query, {"new": 0, "duplicates": 0})
+        vacancies = SuperJobColumns()
+        for response in responses:
+            new, duplicates = vacancies.extend_from_response(response, seen_ids)
+            stats["new"] += new
+            stats["duplicates"] += duplicates
+            if isinstance(response, dict):
+                self.watermarks.advance(query, max(
+                    (vacancy.get('date_published') or 0 for vacancy in response.get('objects') or ()), default=None
+                ))
+        records = vacancies.records()
+        self.store.upsert(self.SOURCE_NAME, records, "vacancy_id", watermarks=self.watermarks.checkpoint(query),
+                          lease=lease)
+        log.info(f"Query '{query}': {stats['new']} new, {stats['duplicates']} duplicates, "
+                 f"total vacancies: {len(seen_ids)}")
+        return records
+
+    async def _get_all_pages(self, params, query: str) -> List[Dict[str, Any]]:
+        """
+        Забирает все страницы выдачи: первая страница даёт total, остальные запрашиваются параллельно.
+
+        API отдаёт не больше max_results вакансий на один запрос. Если у запроса есть отметка,
+        выполняется инкрементальный запрос - см. _get_new_pages.
+        """
+        log.info(f"Getting vacancies for query '{query}'")
+        since = self.watermarks.get(query)
+        if since is not None:
+            return await self._get_new_pages(params, since)
+
+        url = self.base_url + "/vacancies/"
+        first_page = await self.make_request("GET", url, params={**params, "page": 0, "count": self.page_size},
+                                             headers=self.default_headers)
+        if not isinstance(first_page, dict) or not first_page.get("more"):
+            return [first_page]
+
+        total = min(first_page.get("total", 0), self.max_results)
+        pages_count = math.ceil(total / self.page_size)
+        rest = await gather_or_cancel(*[
+            self.make_request("GET", url, params={**params, "page": page, "count": self.page_size},
+                              headers=self.default_headers)
+            for page in range(1, pages_count)
+        ])
+        return [first_page, *rest]
+
+    async def _get_new_pages(self, params, since: int) -> List[Dict[str, Any]]:
+        """
+        Забирает только вакансии, опубликованные не раньше отметки since (date_published_from).
+
+        Если запрос не задаёт свою сортировку, выдача идёт по дате от новых к старым и страницы
+        запрашиваются по одной: как только на странице встречается вакансия старше отметки, дальше идут уже сохранённые.
+        Вакансии старше отметки отбрасываются и на случай, если API фильтр не применил.
+        """
+        url = self.base_url + "/vacancies/"
+        params = {**params, "date_published_from": since}
+        by_date = "order_field" not in params
+        if by_date:
+            params.update(order_field="date", order_direction="desc")
+
+        pages = []
+        for page in range(math.ceil(self.max_results / self.page_size)):
+            response = await self.make_request("GET", url, params={**params, "page": page, "count": self.page_size},
+                                               headers=self.default_headers)
+            if not isinstance(response, dict):
+                break
+            objects = response.get("objects") or []
+            fresh = [vacancy for vacancy in objects if (vacancy.get("date_published") or 0) >= since]
+            pages.append({**response, "objects": fresh})
+            if not response.get("more") or (by_date and len(fresh) < len(objects)):
+                break
+        return pages
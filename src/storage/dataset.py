@@ -0,0 +1,259 @@
+"""
+Module Description:
+Module stores vacancies as a compressed Parquet dataset partitioned by source and crawl date
+and loads it lazily with column projection and row-group filtering.
+
+Usage (one-shot conversion of the legacy files in data/; --crawl-date is needed for files whose
+name and metadata carry no date, e.g. the rabota.ru CSV):
+    python -m src.storage.dataset convert data --root dataset --crawl-date 2025-06-14
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import argparse
+import datetime as dt
+import glob
+import logging
+import os
+import re
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DATASET_ROOT = "dataset"
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+# Сортировка внутри файла делает статистики row group узкими, и фильтры по ним отсекают больше
+SORT_COLUMNS = {
+    "rabota_ru": "salary_from",
+    "superjob_ru": "payment_from",
+}
+
+# Легаси-файлы из data/ и источник, к которому они относятся
+LEGACY_FILES = {
+    "rabota_ru_vacancies.csv": "rabota_ru",
+    "Вакансии_hh_ru.xlsx": "hh_ru",
+}
+
+Filter = Tuple[str, str, Any]
+
+# Дата в имени файла: 2025-02-27, 2025_02_27 или 27.02.2025
+_FILE_DATE_PATTERNS = (
+    (re.compile(r"(\d{4})[-_.](\d{2})[-_.](\d{2})"), lambda m: (m[1], m[2], m[3])),
+    (re.compile(r"(\d{2})\.(\d{2})\.(\d{4})"), lambda m: (m[3], m[2], m[1])),
+)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar dataset requires pyarrow: pip install pyarrow")
+
+
+def partition_dir(root: str, source: str, crawl_date: Union[str, dt.date]) -> str:
+    return os.path.join(root, f"source={source}", f"crawl_date={crawl_date}")
+
+
+def write_partition(
+        data: Union[pd.DataFrame, List[Dict[str, Any]]],
+        source: str,
+        crawl_date: Union[str, dt.date, None] = None,
+        root: str = DEFAULT_DATASET_ROOT,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        file_name: Optional[str] = None
+) -> Optional[str]:
+    """
+    Записывает батч файлом в партицию source/crawl_date и возвращает путь к нему.
+
+    Без file_name файл новый (part-<uuid>), с file_name существующий файл с этим именем перезаписывается.
+    """
+    _require_pyarrow()
+    table = pa.Table.from_pandas(data, preserve_index=False) if isinstance(data, pd.DataFrame) \
+        else pa.Table.from_pylist(data)
+    if table.num_rows == 0:
+        return None
+
+    sort_column = SORT_COLUMNS.get(source)
+    if sort_column in table.column_names:
+        table = table.sort_by([(sort_column, "ascending")])
+
+    directory = partition_dir(root, source, crawl_date or dt.date.today().isoformat())
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, file_name or f"part-{uuid.uuid4().hex}.parquet")
+    pq.write_table(table, path, compression="zstd", row_group_size=row_group_size, write_statistics=True)
+    log.info(f"Wrote {table.num_rows} {source} rows to {path}")
+    return path
+
+
+def _expression(filters: Iterable[Filter], schema: "pa.Schema"):
+    """Переводит фильтры вида (колонка, оператор, значение) в выражение pyarrow, соединяя их через AND."""
+    expression = None
+    for column, op, value in filters:
+        if column not in schema.names:
+            raise KeyError(f"Unknown column in filter: {column}")
+        field = pc.field(column)
+        if op == "==":
+            condition = field == value
+        elif op == "!=":
+            condition = field != value
+        elif op == "<":
+            condition = field < value
+        elif op == "<=":
+            condition = field <= value
+        elif op == ">":
+            condition = field > value
+        elif op == ">=":
+            condition = field >= value
+        elif op == "in":
+            condition = field.isin(list(value))
+        elif op == "not in":
+            condition = ~field.isin(list(value))
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _filtered_columns(filters: Iterable[Filter]) -> List[str]:
+    return [column for column, _, _ in filters]
+
+
+def list_sources(root: str = DEFAULT_DATASET_ROOT) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(name.split("=", 1)[1] for name in os.listdir(root) if name.startswith("source="))
+
+
+def load(
+        root: str = DEFAULT_DATASET_ROOT,
+        sources: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Sequence[Filter]] = None,
+        crawl_date_from: Optional[str] = None,
+        crawl_date_to: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Читает из датасета только нужные колонки и строки.
+
+    Партиции отбираются по source и crawl_date без чтения файлов, а filters проверяются по
+    статистикам row group, так что неподходящие группы строк не читаются с диска. Источник, в схеме
+    которого нет колонки из filters, строк не даёт; KeyError - только если колонки нет ни в одном.
+    """
+    _require_pyarrow()
+    frames = []
+    filter_columns = set(_filtered_columns(filters or []))
+    known_columns = set()
+    for source in sources or list_sources(root):
+        source_dir = os.path.join(root, f"source={source}")
+        if not os.path.isdir(source_dir):
+            continue
+        partitioning = ds.partitioning(pa.schema([("crawl_date", pa.string())]), flavor="hive")
+        files = ds.dataset(source_dir, format="parquet", partitioning=partitioning).files
+        if not files:
+            continue
+        # В файлах разных обходов пустые колонки имеют тип null - приводим все файлы к общей схеме
+        schema = pa.unify_schemas([pq.read_schema(path) for path in files], promote_options="permissive")
+        dataset = ds.dataset(files, schema=schema.append(pa.field("crawl_date", pa.string())), format="parquet",
+                             partitioning=partitioning, partition_base_dir=source_dir)
+
+        known_columns.update(filter_columns.intersection(dataset.schema.names))
+        if not filter_columns.issubset(dataset.schema.names):
+            log.info(f"Skipping {source}: no {sorted(filter_columns.difference(dataset.schema.names))} columns")
+            continue
+
+        date_filters = []
+        if crawl_date_from:
+            date_filters.append(("crawl_date", ">=", crawl_date_from))
+        if crawl_date_to:
+            date_filters.append(("crawl_date", "<=", crawl_date_to))
+        expression = _expression([*(filters or []), *date_filters], dataset.schema)
+
+        selected = [column for column in columns if column in dataset.schema.names] if columns else None
+        table = dataset.to_table(columns=selected, filter=expression)
+        frame = table.to_pandas()
+        frame.insert(0, "source", source)
+        frames.append(frame)
+
+    unknown = filter_columns - known_columns
+    if unknown:
+        raise KeyError(f"Unknown column in filter: {', '.join(sorted(unknown))}")
+    if not frames:
+        return pd.DataFrame(columns=["source", *(columns or [])])
+    return pd.concat(frames, ignore_index=True)
+
+
+def legacy_crawl_date(path: str) -> Optional[str]:
+    """
+    Дата обхода легаси-файла: дата в имени файла, для XLSX - дата изменения из свойств книги.
+
+    Время изменения файла на диске не подходит - это дата checkout, а не обхода.
+    """
+    name = os.path.basename(path)
+    for pattern, parts in _FILE_DATE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            year, month, day = parts(match)
+            return dt.date(int(year), int(month), int(day)).isoformat()
+    if path.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        stamp = workbook.properties.modified or workbook.properties.created
+        workbook.close()
+        if stamp is not None:
+            return stamp.date().isoformat()
+    return None
+
+
+def convert_legacy_files(data_dir: str, root: str = DEFAULT_DATASET_ROOT,
+                         crawl_date: Optional[str] = None) -> List[str]:
+    """
+    Переводит CSV/XLSX из data/ в датасет. Дата обхода - из legacy_crawl_date, а для файлов
+    без даты в имени и метаданных - crawl_date; если и его нет, ValueError.
+
+    Каждый файл пишется под постоянным именем legacy-<имя>.parquet, так что повторная конвертация
+    заменяет прежний результат (в том числе лежащий в партиции другой даты), а не дублирует строки.
+    """
+    paths = []
+    for file_name, source in LEGACY_FILES.items():
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        file_date = legacy_crawl_date(path) or crawl_date
+        if file_date is None:
+            raise ValueError(f"Crawl date of {path} is unknown: put it in the file name or pass --crawl-date")
+        log.info(f"Converting {path} (crawled {file_date})")
+        df = pd.read_excel(path) if path.endswith(".xlsx") else pd.read_csv(path)
+        target = f"legacy-{os.path.splitext(file_name)[0]}.parquet"
+        for previous in glob.glob(os.path.join(root, f"source={source}", "crawl_date=*", target)):
+            os.remove(previous)
+        paths.append(write_partition(df, source, file_date, root, file_name=target))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar vacancy dataset tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert = subparsers.add_parser("convert", help="convert legacy CSV/XLSX files into the dataset")
+    convert.add_argument("data_dir", nargs="?", default="data")
+    convert.add_argument("--root", default=DEFAULT_DATASET_ROOT)
+    convert.add_argument("--crawl-date", help="YYYY-MM-DD for files whose name and metadata carry no date")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "convert":
+        convert_legacy_files(args.data_dir, args.root, args.crawl_date)
+
+
+if __name__ == "__main__":
+    main()
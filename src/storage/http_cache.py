@@ -0,0 +1,139 @@
+"""
+Module Description:
+Module provides an on-disk HTTP response cache with TTL, conditional revalidation and LRU eviction.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "http_cache.db"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Заголовки запроса, от которых зависит содержимое ответа (HTML под браузер, язык, ключ приложения)
+VARY_HEADERS = ("accept", "accept-language", "user-agent", "cookie", "x-api-app-id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Заголовки для условного запроса, если сервер отдал ETag/Last-Modified."""
+        validators = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+
+def make_cache_key(method: str, url: str, params: Optional[Dict[str, Any]], body: Optional[Dict[str, Any]],
+                   headers: Optional[Dict[str, str]] = None) -> str:
+    """
+    Ключ кеша по методу, URL, параметрам, канонизированному телу (как в get_signature) и заголовкам из VARY_HEADERS.
+
+    Короткоживущие токены (X-Token, Authorization) в ключ не входят: ответ от них не зависит,
+    а с ними кеш устаревал бы при каждом обновлении токена.
+    """
+    vary = {name.lower(): value for name, value in (headers or {}).items() if name.lower() in VARY_HEADERS}
+    canonical = json.dumps(
+        {"method": method.upper(), "url": url, "params": params or {}, "body": body or {}, "headers": vary},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """Кеш ответов в SQLite; при превышении max_bytes вытесняются давно не читавшиеся записи."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self.size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = self._conn.execute(
+            "SELECT status, headers, content, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        status, headers, content, expires_at = row
+        return CachedResponse(status, json.loads(headers), content, expires_at)
+
+    def put(self, key: str, status: int, headers: Dict[str, str], content: bytes, ttl: float):
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        headers = {name.lower(): value for name, value in headers.items()}
+        with self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, content, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(headers), content, size, now + ttl, now),
+            )
+        self.size += size - (old[0] if old else 0)
+        if self.size > self.max_bytes:
+            self._evict()
+
+    def refresh(self, key: str, ttl: float):
+        """Продлевает запись после ответа 304 Not Modified."""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?", (now + ttl, now, key)
+            )
+
+    def _evict(self):
+        """Удаляет записи в порядке LRU, пока кеш не уложится в бюджет."""
+        with self._conn:
+            cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access")
+            keys = []
+            for key, size in cursor:
+                if self.size <= self.max_bytes:
+                    break
+                keys.append((key,))
+                self.size -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+            evicted = len(keys)
+        log.info(f"Evicted {evicted} cached responses, cache size {self.size} bytes")
@@ -0,0 +1,170 @@
+"""
+Module Description:
+Module provides incremental SQLite (WAL) storage for vacancies and crawl checkpoints shared by all sources.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.storage.work_queue import WORK_QUEUE_SCHEMA, Lease, complete_lease
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = "vacancies.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vacancies (
+    source TEXT NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, vacancy_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE TABLE IF NOT EXISTS id_bitmaps (
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    bits BLOB NOT NULL,
+    PRIMARY KEY (source, name, block)
+);
+"""
+
+
+class VacancyStore:
+    """
+    Хранилище вакансий с upsert по (source, vacancy_id).
+
+    Новые записи и чекпоинт фиксируются в одной транзакции, поэтому после падения
+    чекпоинт никогда не опережает сохранённые данные.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        # Файл могут делить несколько процессов (см. WorkQueue) - ждём чужую транзакцию, а не падаем
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA + WORK_QUEUE_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def upsert(
+            self,
+            source: str,
+            records: Iterable[Dict[str, Any]],
+            id_field: str,
+            checkpoint: Optional[Dict[str, Any]] = None,
+            bitmaps: Optional[Dict[str, Dict[int, bytes]]] = None,
+            watermarks: Optional[Dict[str, int]] = None,
+            lease: Optional[Lease] = None
+    ) -> int:
+        """
+        Добавляет или обновляет записи и, если переданы, чекпоинт и изменённые блоки битовых карт - атомарно.
+
+        watermarks - отметки, которые только растут, даже если их пишут несколько процессов.
+        lease - аренда единицы работы: она завершается в той же транзакции, а если аренда потеряна,
+        транзакция откатывается с LeaseLost и записи не сохраняются.
+        """
+        now = time.time()
+        rows = [
+            (source, str(record[id_field]), json.dumps(record, ensure_ascii=False, default=str), now)
+            for record in records
+            if record.get(id_field) is not None
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO vacancies (source, vacancy_id, payload, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (source, vacancy_id) DO UPDATE SET payload = excluded.payload, "
+                "updated_at = excluded.updated_at",
+                rows,
+            )
+            if checkpoint:
+                self._set_checkpoint_values(source, checkpoint)
+            if watermarks:
+                self._advance_checkpoint_values(source, watermarks)
+            for name, blocks in (bitmaps or {}).items():
+                self._conn.executemany(
+                    "INSERT INTO id_bitmaps (source, name, block, bits) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (source, name, block) DO UPDATE SET bits = excluded.bits",
+                    [(source, name, block, bits) for block, bits in blocks.items()],
+                )
+            if lease is not None:
+                complete_lease(self._conn, lease)
+        log.info(f"Stored {len(rows)} {source} vacancies")
+        return len(rows)
+
+    def set_checkpoint(self, source: str, key: str, value: Any):
+        with self._conn:
+            self._set_checkpoint_values(source, {key: value})
+
+    def advance_watermarks(self, source: str, values: Dict[str, int]):
+        with self._conn:
+            self._advance_checkpoint_values(source, values)
+
+    def get_checkpoint(self, source: str, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM checkpoints WHERE source = ? AND key = ?", (source, key)
+        ).fetchone()
+        return row[0] if row else default
+
+    def get_checkpoints(self, source: str, prefix: str = "") -> Dict[str, str]:
+        """Все чекпоинты источника, ключ которых начинается с prefix."""
+        rows = self._conn.execute(
+            "SELECT key, value FROM checkpoints WHERE source = ? AND substr(key, 1, ?) = ?",
+            (source, len(prefix), prefix),
+        ).fetchall()
+        return dict(rows)
+
+    def load_bitmap(self, source: str, name: str) -> Dict[int, bytes]:
+        """Возвращает блоки битовой карты (например, промахов по ID): номер блока -> биты."""
+        rows = self._conn.execute(
+            "SELECT block, bits FROM id_bitmaps WHERE source = ? AND name = ?", (source, name)
+        ).fetchall()
+        return dict(rows)
+
+    def count(self, source: str) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM vacancies WHERE source = ?", (source,)).fetchone()
+        return row[0]
+
+    def iter_records(self, source: str, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Лениво читает сохранённые записи источника."""
+        cursor = self._conn.execute(
+            "SELECT payload FROM vacancies WHERE source = ? ORDER BY rowid", (source,)
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for (payload,) in rows:
+                yield json.loads(payload)
+
+    def load_records(self, source: str) -> List[Dict[str, Any]]:
+        return list(self.iter_records(source))
+
+    def _set_checkpoint_values(self, source: str, values: Dict[str, Any]):
+        self._conn.executemany(
+            "INSERT INTO checkpoints (source, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (source, key) DO UPDATE SET value = excluded.value",
+            [(source, key, str(value)) for key, value in values.items()],
+        )
+
+    def _advance_checkpoint_values(self, source: str, values: Dict[str, int]):
+        self._conn.executemany(
+            "INSERT INTO checkpoints (source, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (source, key) DO UPDATE SET value = CAST(MAX(CAST(value AS INTEGER), "
+            "CAST(excluded.value AS INTEGER)) AS TEXT)",
+            [(source, key, str(value)) for key, value in values.items()],
+        )
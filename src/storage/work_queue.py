@@ -0,0 +1,248 @@
+"""
+Module Description:
+Module provides a lease-based work queue in SQLite: crawls are split into units (ID ranges, queries,
+role/page pairs) that worker processes lease with a timeout, so abandoned units are re-leased
+and every unit's results are committed exactly once.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.tasks import gather_or_cancel
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_POLL_INTERVAL = 2.0
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+WORK_QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_units (
+    run_id TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    unit_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, queue, unit_key)
+);
+CREATE INDEX IF NOT EXISTS work_units_state ON work_units (run_id, queue, state);
+"""
+
+
+class LeaseLost(Exception):
+    """Аренда истекла и единица отдана другому воркеру (или уже завершена им) - результат не фиксируется."""
+
+
+@dataclass
+class Lease:
+    run_id: str
+    queue: str
+    key: str
+    payload: Dict[str, Any]
+    token: str
+    attempt: int
+
+
+def complete_lease(conn: sqlite3.Connection, lease: Lease):
+    """
+    Помечает единицу выполненной внутри уже открытой транзакции conn.
+
+    Вызывается в той же транзакции, что и запись результатов (см. VacancyStore.upsert), поэтому
+    результаты единицы фиксируются ровно один раз: если аренду перехватили, транзакция откатывается.
+    """
+    cursor = conn.execute(
+        "UPDATE work_units SET state = ?, lease_expires = NULL, updated_at = ? "
+        "WHERE run_id = ? AND queue = ? AND unit_key = ? AND lease_token = ? AND state = ?",
+        (DONE, time.time(), lease.run_id, lease.queue, lease.key, lease.token, LEASED),
+    )
+    if cursor.rowcount != 1:
+        raise LeaseLost(f"Lease on {lease.queue}/{lease.key} is no longer held")
+
+
+class WorkQueue:
+    """
+    Очереди единиц работы одного запуска (run_id) в файле SQLite - обычно в том же, что и VacancyStore.
+
+    Воркеры с одинаковым run_id в разных процессах (или на машинах с общим файлом) делят единицы:
+    единица отдаётся в аренду на lease_seconds и продлевается, пока воркер жив. Единица, чья аренда
+    истекла, снова выдаётся; после max_attempts неудачных попыток она помечается failed.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            run_id: str = "default",
+            lease_seconds: float = DEFAULT_LEASE_SECONDS,
+            max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+            owner: Optional[str] = None
+    ):
+        self.path = path
+        self.run_id = run_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        # Блокировку записи держит другой процесс не дольше одной транзакции - ждём, а не падаем
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(WORK_QUEUE_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def enqueue(self, queue: str, units: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Добавляет единицы (ключ, payload); уже существующие ключи не трогаются, поэтому вызов идемпотентен."""
+        now = time.time()
+        rows = [(self.run_id, queue, key, json.dumps(payload, ensure_ascii=False), PENDING, now)
+                for key, payload in units]
+        with self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO work_units (run_id, queue, unit_key, payload, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return cursor.rowcount
+
+    def lease(self, queue: str, limit: int = 1) -> List[Lease]:
+        """Берёт в аренду до limit свободных единиц или единиц с истёкшей арендой."""
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._conn:
+            # Брошенные единицы, исчерпавшие попытки, больше не выдаются
+            self._conn.execute(
+                "UPDATE work_units SET state = ?, error = 'lease expired', updated_at = ? "
+                "WHERE run_id = ? AND queue = ? AND state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, self.run_id, queue, LEASED, now, self.max_attempts),
+            )
+            rows = self._conn.execute(
+                "UPDATE work_units SET state = ?, owner = ?, lease_token = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? "
+                "WHERE rowid IN (SELECT rowid FROM work_units WHERE run_id = ? AND queue = ? "
+                "AND (state = ? OR (state = ? AND lease_expires < ?)) ORDER BY rowid LIMIT ?) "
+                "RETURNING unit_key, payload, attempts",
+                (LEASED, self.owner, token, now + self.lease_seconds, now, self.run_id, queue, PENDING, LEASED, now,
+                 limit),
+            ).fetchall()
+        return [Lease(self.run_id, queue, key, json.loads(payload), token, attempt) for key, payload, attempt in rows]
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Продлевает аренду; False - аренда уже потеряна."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE work_units SET lease_expires = ?, updated_at = ? "
+                "WHERE run_id = ? AND queue = ? AND unit_key = ? AND lease_token = ? AND state = ?",
+                (time.time() + self.lease_seconds, time.time(), lease.run_id, lease.queue, lease.key, lease.token,
+                 LEASED),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, lease: Lease):
+        """Завершает единицу без результатов; если она уже зафиксирована этой арендой, ничего не делает."""
+        try:
+            with self._conn:
+                complete_lease(self._conn, lease)
+        except LeaseLost:
+            row = self._conn.execute(
+                "SELECT state, lease_token FROM work_units WHERE run_id = ? AND queue = ? AND unit_key = ?",
+                (lease.run_id, lease.queue, lease.key),
+            ).fetchone()
+            if row != (DONE, lease.token):
+                raise
+
+    def release(self, lease: Lease, error: Optional[str] = None, failed: bool = True):
+        """
+        Возвращает единицу в очередь после ошибки (или помечает failed, если попытки исчерпаны).
+
+        failed=False - единицу просто отпустили (остановка воркера), попытка не засчитывается.
+        """
+        with self._conn:
+            self._conn.execute(
+                "UPDATE work_units SET attempts = attempts - ?, "
+                "state = CASE WHEN attempts - ? >= ? THEN ? ELSE ? END, lease_token = NULL, "
+                "lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE run_id = ? AND queue = ? AND unit_key = ? AND lease_token = ? AND state = ?",
+                (int(not failed), int(not failed), self.max_attempts, FAILED, PENDING, error, time.time(),
+                 lease.run_id, lease.queue, lease.key, lease.token, LEASED),
+            )
+
+    def counts(self, queue: str) -> Dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT state, COUNT(*) FROM work_units WHERE run_id = ? AND queue = ? GROUP BY state",
+            (self.run_id, queue),
+        ).fetchall()
+        return dict(rows)
+
+    def unfinished(self, queue: str, key_prefix: str = "") -> int:
+        """Количество ещё не выполненных (в том числе неудавшихся) единиц очереди, ключ которых начинается с key_prefix."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM work_units WHERE run_id = ? AND queue = ? AND state != ? "
+            "AND substr(unit_key, 1, ?) = ?",
+            (self.run_id, queue, DONE, len(key_prefix), key_prefix),
+        ).fetchone()[0]
+
+    async def run(self, queue: str, handler: Callable[[Lease], Awaitable[None]], concurrency: int = 1,
+                  poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Выполняет единицы очереди, пока не останется ни свободных, ни арендованных другими.
+
+        handler фиксирует результаты через VacancyStore.upsert(..., lease=lease); единица без
+        результатов завершается здесь. Пока единицы в аренде у других воркеров, очередь опрашивается
+        раз в poll_interval, чтобы подобрать брошенные после истечения аренды.
+        """
+        async def worker():
+            while True:
+                leases = self.lease(queue)
+                if not leases:
+                    counts = self.counts(queue)
+                    if not counts.get(PENDING) and not counts.get(LEASED):
+                        return
+                    await asyncio.sleep(poll_interval)
+                    continue
+                await self._run_unit(leases[0], handler)
+
+        await gather_or_cancel(*[worker() for _ in range(concurrency)])
+        log.info(f"Work queue {queue} ({self.run_id}) drained: {self.counts(queue)}")
+
+    async def _run_unit(self, lease: Lease, handler: Callable[[Lease], Awaitable[None]]):
+        keep_alive = asyncio.create_task(self._keep_alive(lease))
+        try:
+            await handler(lease)
+            self.complete(lease)
+        except LeaseLost:
+            log.warning(f"Lease on {lease.queue}/{lease.key} lost, results discarded")
+        except asyncio.CancelledError:
+            self.release(lease, "cancelled", failed=False)
+            raise
+        except Exception as e:
+            log.exception(f"Unit {lease.queue}/{lease.key} failed on attempt {lease.attempt}")
+            self.release(lease, repr(e))
+        finally:
+            keep_alive.cancel()
+
+    async def _keep_alive(self, lease: Lease):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.heartbeat(lease):
+                log.warning(f"Lease on {lease.queue}/{lease.key} expired before heartbeat")
+                return
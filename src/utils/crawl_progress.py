@@ -0,0 +1,102 @@
+"""
+Module Description:
+Module tracks progress of crawls: contiguous checkpoint for ID ranges, per-query watermarks for
+incremental runs and per-worker stats.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+class ContiguousCheckpoint:
+    """
+    Low-water mark для ID, которые обрабатываются не по порядку.
+
+    `value` - наименьший ID, который ещё не завершён: все ID ниже него гарантированно обработаны.
+    """
+
+    def __init__(self, start: int):
+        self.value = start
+        self._done: List[Tuple[int, int]] = []
+
+    def mark_done(self, idx: int) -> int:
+        """Отмечает ID как обработанный и возвращает новое значение чекпоинта."""
+        return self.mark_range(idx, idx + 1)
+
+    def mark_range(self, start: int, end: int) -> int:
+        """Отмечает обработанными ID из полуинтервала [start, end) - например, пропущенные без запроса."""
+        if end <= self.value or start >= end:
+            return self.value
+        heapq.heappush(self._done, (start, end))
+        while self._done and self._done[0][0] <= self.value:
+            self.value = max(self.value, heapq.heappop(self._done)[1])
+        return self.value
+
+    @property
+    def pending(self) -> int:
+        """Количество завершённых участков, ожидающих закрытия "дыры" перед ними."""
+        return len(self._done)
+
+
+class Watermarks:
+    """
+    Верхние отметки по запросам одного источника: самое новое, что уже сохранено (дата публикации, ID).
+
+    Отметки хранятся в таблице чекпоинтов под ключами "watermark:<запрос>". Новое значение попадает
+    в хранилище только через checkpoint() и записывается вместе с вакансиями запроса, поэтому отметка
+    не опережает данные; при записи из нескольких процессов сохраняется наибольшее значение.
+    """
+    PREFIX = "watermark:"
+
+    def __init__(self, values: Optional[Dict[str, str]] = None):
+        self._values: Dict[str, int] = {query: int(value) for query, value in (values or {}).items()}
+
+    @classmethod
+    def load(cls, store, source: str) -> "Watermarks":
+        stored = store.get_checkpoints(source, cls.PREFIX)
+        return cls({key[len(cls.PREFIX):]: value for key, value in stored.items()})
+
+    def get(self, query) -> Optional[int]:
+        return self._values.get(str(query))
+
+    def advance(self, query, value: Optional[int]) -> Optional[int]:
+        """Сдвигает отметку запроса вперёд (назад - никогда) и возвращает текущее значение."""
+        query = str(query)
+        if value is not None and value > self._values.get(query, value - 1):
+            self._values[query] = value
+        return self._values.get(query)
+
+    def checkpoint(self, query) -> Dict[str, int]:
+        """Значение для VacancyStore.upsert(watermarks=...) / advance_watermarks: пусто, если отметки нет."""
+        value = self.get(query)
+        return {} if value is None else {self.PREFIX + str(query): value}
+
+    def __len__(self):
+        return len(self._values)
+
+
+@dataclass
+class WorkerStats:
+    worker_id: int
+    processed: int = 0
+    found: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def avg_latency(self) -> float:
+        return self.busy_seconds / self.processed if self.processed else 0.0
+
+    @property
+    def utilization(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.busy_seconds / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"worker {self.worker_id}: processed={self.processed}, found={self.found}, "
+                f"errors={self.errors}, avg_latency={self.avg_latency:.3f}s, utilization={self.utilization:.0%}")
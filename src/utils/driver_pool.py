@@ -0,0 +1,210 @@
+"""
+Module Description:
+Module provides a pool of headless Chrome drivers for pages that need JavaScript: images, fonts and
+trackers are blocked, a page is ready as soon as its vacancy cards stop changing, and every driver is
+recycled after a fixed number of pages to cap browser memory growth.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+CARD_SELECTOR = '[data-qa="serp-item__title"]'
+
+# Ресурсы, не влияющие на карточки вакансий: картинки, шрифты, медиа, счётчики и реклама
+BLOCKED_URLS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm",
+    "*mc.yandex.ru*", "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*top-fwz1.mail.ru*", "*vk.com/rtrg*", "*facebook.net*", "*adfox*",
+)
+
+CHROME_ARGUMENTS = (
+    "--headless=new",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--blink-settings=imagesEnabled=false",
+    "--window-size=1366,2000",
+)
+
+# Счётчик карточек: заодно прокручивает страницу, чтобы подгрузились карточки, отрисовываемые при прокрутке
+_COUNT_CARDS_JS = (
+    "window.scrollTo(0, document.body.scrollHeight);"
+    f"return document.querySelectorAll('{CARD_SELECTOR}').length;"
+)
+
+
+@dataclass
+class _Slot:
+    driver: Any = None
+    pages: int = 0
+
+
+class CardsRendered:
+    """
+    Условие WebDriverWait: на странице есть карточки и их число не менялось stable_polls опросов подряд.
+
+    Страница без выдачи (роль без вакансий) условия не выполнит - её дождётся таймаут.
+    """
+
+    def __init__(self, stable_polls: int = 2):
+        self.stable_polls = stable_polls
+        self._count = -1
+        self._unchanged = 0
+
+    def __call__(self, driver) -> bool:
+        count = driver.execute_script(_COUNT_CARDS_JS)
+        self._unchanged = self._unchanged + 1 if count == self._count else 0
+        self._count = count
+        return count > 0 and self._unchanged >= self.stable_polls
+
+
+class DriverPool:
+    """
+    Пул из size headless-браузеров; драйверы создаются при первой надобности, selenium импортируется тогда же.
+
+    Страница занимает один драйвер целиком, поэтому size - это и число страниц, загружаемых одновременно.
+    Драйвер, открывший pages_per_driver страниц или упавший с ошибкой, закрывается и создаётся заново.
+    """
+
+    def __init__(
+            self,
+            size: int = 2,
+            pages_per_driver: int = 50,
+            page_timeout: float = 20.0,
+            poll_interval: float = 0.1,
+            blocked_urls: Sequence[str] = BLOCKED_URLS,
+            headless: bool = True
+    ):
+        self.size = size
+        self.pages_per_driver = pages_per_driver
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.blocked_urls = list(blocked_urls)
+        self.headless = headless
+        self.pages = 0
+        self.drivers_started = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: List[_Slot] = [_Slot() for _ in range(size)]
+        self._driver_path: Optional[str] = None
+        self._install_lock = threading.Lock()
+
+    async def load(self, url: str) -> str:
+        """Открывает url в свободном драйвере и возвращает HTML, как только карточки вакансий отрисованы."""
+        async with self._slot() as slot:
+            if slot.driver is None:
+                slot.driver = await asyncio.to_thread(self._create_driver)
+            # shield: при отмене load поток загрузки продолжает работать, и future должна дождаться его
+            page = asyncio.ensure_future(asyncio.to_thread(self._load_sync, slot.driver, url))
+            try:
+                html = await asyncio.shield(page)
+            except BaseException:
+                # Состояние браузера после ошибки или отмены неизвестно - следующую страницу откроет новый
+                self._retire_when_done(slot, page)
+                raise
+            slot.pages += 1
+            self.pages += 1
+            if slot.pages >= self.pages_per_driver:
+                log.info(f"Recycling browser after {slot.pages} pages")
+                await asyncio.to_thread(self._retire, slot)
+            return html
+
+    def close(self):
+        for slot in self._slots:
+            self._retire(slot)
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[_Slot]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+        slot = await self._idle.get()
+        try:
+            yield slot
+        finally:
+            self._idle.put_nowait(slot)
+
+    def _load_sync(self, driver, url: str) -> str:
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        started = time.perf_counter()
+        driver.get(url)
+        try:
+            WebDriverWait(driver, self.page_timeout, poll_frequency=self.poll_interval).until(CardsRendered())
+        except TimeoutException:
+            log.warning(f"No vacancy cards rendered on {url} within {self.page_timeout}s")
+        log.debug(f"Rendered {url} in {time.perf_counter() - started:.2f}s")
+        return driver.page_source
+
+    def _create_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        options = webdriver.ChromeOptions()
+        for argument in CHROME_ARGUMENTS:
+            if self.headless or argument != "--headless=new":
+                options.add_argument(argument)
+        # get() возвращается после DOMContentLoaded, дальше ждём карточки, а не все ресурсы страницы
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+        driver = webdriver.Chrome(service=Service(self._chromedriver_path()), options=options)
+        driver.set_page_load_timeout(self.page_timeout)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        self.drivers_started += 1
+        log.info(f"Started headless browser {self.drivers_started} (pool of {self.size})")
+        return driver
+
+    def _chromedriver_path(self) -> str:
+        """Драйвер скачивается (или берётся из кеша webdriver_manager) один раз на пул."""
+        with self._install_lock:
+            if self._driver_path is None:
+                from webdriver_manager.chrome import ChromeDriverManager
+
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _retire_when_done(self, slot: _Slot, page: asyncio.Future):
+        """
+        Отвязывает драйвер от слота сразу, а закрывает в потоке, когда загрузка page вернулась:
+        quit() посреди get() в другом потоке гонялся бы с ним и блокировал бы цикл событий.
+        """
+        driver, slot.driver, slot.pages = slot.driver, None, 0
+        loop = asyncio.get_running_loop()
+
+        def quit_driver(done: asyncio.Future):
+            if not done.cancelled():
+                done.exception()  # ошибка уже проброшена вызывающему, здесь только помечаем её полученной
+            loop.run_in_executor(None, self._quit, driver)
+
+        page.add_done_callback(quit_driver)
+
+    @classmethod
+    def _retire(cls, slot: _Slot):
+        if slot.driver is not None:
+            cls._quit(slot.driver)
+            slot.driver = None
+            slot.pages = 0
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            log.exception("Failed to quit browser")
@@ -0,0 +1,162 @@
+"""
+Module Description:
+Module extracts vacancy cards from hh.ru search result pages off the event loop.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+log = logging.getLogger(__name__)
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+NOT_SPECIFIED = "Не указано"
+
+FIELDS = ("title", "link", "location", "salary", "company", "experience", "description", "requirements")
+
+
+def _class_prefix(prefix: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class)), " {prefix}")'
+
+
+def _class_token(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# Таблица селекторов: поле -> (XPath относительно карточки, нужен ли strip текста).
+# Классы без data-qa сравниваются по префиксу, чтобы не зависеть от хеша версии дизайн-системы.
+SELECTORS = {
+    "title": ('.//a[@data-qa="serp-item__title"]', True),
+    "location": ('.//span[@data-qa="vacancy-serp__vacancy-address"]', True),
+    "salary": (f'.//span[{_class_prefix("magritte-text_style-primary___")} '
+               f'and {_class_prefix("magritte-text_typography-label-1-regular___")}]', False),
+    "company": ('.//span[@data-qa="vacancy-serp__vacancy-employer-text"]', True),
+    "experience": (f'.//div[{_class_prefix("magritte-tag__label___")}]', True),
+    "description": ('.//div[@data-qa="vacancy-serp__vacancy_snippet_responsibility"]', True),
+    "requirements": ('.//div[@data-qa="vacancy-serp__vacancy_snippet_requirement"]', True),
+}
+CARDS_XPATH = f'//div[{_class_token("magritte-redesign")}]'
+PAGER_XPATH = '//a[@data-qa="pager-page"]'
+
+if lxml_html is not None:
+    PARSER = "lxml"
+    _CARDS = etree.XPath(CARDS_XPATH)
+    _PAGER = etree.XPath(PAGER_XPATH)
+    _SELECTORS = {field: (etree.XPath(xpath), strip) for field, (xpath, strip) in SELECTORS.items()}
+else:
+    PARSER = "html.parser"
+    _CARD_STRAINER = SoupStrainer("div", class_="magritte-redesign")
+    _PAGER_STRAINER = SoupStrainer("a", attrs={"data-qa": "pager-page"})
+    _SELECTORS = {
+        "title": ("a", {"data-qa": "serp-item__title"}),
+        "location": ("span", {"data-qa": "vacancy-serp__vacancy-address"}),
+        "salary": ("span", {"class": lambda css_class: bool(css_class) and all(
+            f" {prefix}" in f" {css_class}" for prefix in ("magritte-text_style-primary___",
+                                                           "magritte-text_typography-label-1-regular___"))}),
+        "company": ("span", {"data-qa": "vacancy-serp__vacancy-employer-text"}),
+        "experience": ("div", {"class": re.compile(r"^magritte-tag__label___")}),
+        "description": ("div", {"data-qa": "vacancy-serp__vacancy_snippet_responsibility"}),
+        "requirements": ("div", {"data-qa": "vacancy-serp__vacancy_snippet_requirement"}),
+    }
+
+
+def _text(texts, strip: bool) -> str:
+    # Повторяет семантику BeautifulSoup.get_text(strip=...)
+    if strip:
+        return "".join(text.strip() for text in texts)
+    return "".join(texts)
+
+
+def _normalize_salary(salary: str) -> str:
+    salary = salary.replace("\u202f", " ")
+    return salary.replace("\xa0до вычета налогов", " до вычета налогов")
+
+
+def _build_vacancy(role, found: Dict[str, Any]) -> Dict[str, Any]:
+    if "salary" in found:
+        found["salary"] = _normalize_salary(found["salary"])
+    vacancy = {"role_id": role}
+    for field in FIELDS:
+        vacancy[field] = found.get(field, "" if field == "link" else NOT_SPECIFIED)
+    return vacancy
+
+
+def _extract_card_lxml(card, role) -> Dict[str, Any]:
+    found = {}
+    for field, (xpath, strip) in _SELECTORS.items():
+        elements = xpath(card)
+        if elements:
+            found[field] = _text(elements[0].itertext(), strip)
+            if field == "title":
+                found["link"] = elements[0].get("href", "")
+    return _build_vacancy(role, found)
+
+
+def _extract_card_bs4(card, role) -> Dict[str, Any]:
+    found = {}
+    for field, (tag, attrs) in _SELECTORS.items():
+        element = card.find(tag, attrs)
+        if element is not None:
+            found[field] = element.get_text(strip=field != "salary")
+            if field == "title":
+                found["link"] = element.get("href", "")
+    return _build_vacancy(role, found)
+
+
+def extract_vacancies(html: str, role) -> List[Dict[str, Any]]:
+    """Парсит только карточки вакансий по таблице предкомпилированных селекторов."""
+    if lxml_html is not None:
+        return [_extract_card_lxml(card, role) for card in _CARDS(lxml_html.fromstring(html))]
+    soup = BeautifulSoup(html, PARSER, parse_only=_CARD_STRAINER)
+    return [_extract_card_bs4(card, role) for card in soup.find_all("div", class_="magritte-redesign")]
+
+
+def extract_num_of_pages(html: str) -> int:
+    """Определяет количество страниц по ссылкам пагинатора."""
+    if lxml_html is not None:
+        pages = _PAGER(lxml_html.fromstring(html))
+        return int(_text(pages[-1].itertext(), True)) if pages else 1
+    pages = BeautifulSoup(html, PARSER, parse_only=_PAGER_STRAINER).find_all("a")
+    return int(pages[-1].get_text(strip=True)) if pages else 1
+
+
+class HHExtractor:
+    """
+    Выполняет разбор страниц в пуле процессов, чтобы парсинг шёл параллельно со скачиванием.
+
+    При workers=0 разбор выполняется в текущем потоке.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def extract_vacancies(self, html: str, role) -> List[Dict[str, Any]]:
+        return await self._run(extract_vacancies, html, role)
+
+    async def extract_num_of_pages(self, html: str) -> int:
+        return await self._run(extract_num_of_pages, html)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, func, *args):
+        if self.workers == 0:
+            return func(*args)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            log.info(f"Started HTML extraction pool with {self.workers or os.cpu_count()} workers")
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
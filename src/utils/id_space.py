@@ -0,0 +1,221 @@
+"""
+Module Description:
+Module probes sparse integer ID spaces: a persisted bitmap of missing IDs and an adaptive prober
+that gallops over empty regions and finds the upper bound of the space by itself.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from src.utils.crawl_progress import ContiguousCheckpoint
+
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class IdBitmap:
+    """
+    Множество ID в виде битовой карты, разбитой на блоки по block_size бит.
+
+    Хранятся только блоки, в которых есть хотя бы один ID; изменённые блоки отдаются
+    через dirty_blocks, чтобы сохранять в хранилище только их.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, blocks: Optional[Dict[int, bytes]] = None):
+        if block_size % 8:
+            raise ValueError("block_size must be a multiple of 8")
+        self.block_size = block_size
+        self._full = b"\xff" * (block_size // 8)
+        self._blocks: Dict[int, bytearray] = {block: bytearray(bits) for block, bits in (blocks or {}).items()}
+        self._dirty = set()
+
+    def __contains__(self, idx: int) -> bool:
+        bits = self._blocks.get(idx // self.block_size)
+        if bits is None:
+            return False
+        offset = idx % self.block_size
+        return bool(bits[offset >> 3] & (1 << (offset & 7)))
+
+    def __len__(self):
+        return sum(bin(byte).count("1") for bits in self._blocks.values() for byte in bits)
+
+    def add(self, idx: int):
+        block = idx // self.block_size
+        bits = self._blocks.get(block)
+        if bits is None:
+            bits = self._blocks[block] = bytearray(self.block_size // 8)
+        offset = idx % self.block_size
+        bits[offset >> 3] |= 1 << (offset & 7)
+        self._dirty.add(block)
+
+    def discard_from(self, idx: int):
+        """Убирает из множества все ID >= idx."""
+        for block in sorted(self._blocks):
+            if (block + 1) * self.block_size <= idx:
+                continue
+            bits = self._blocks[block]
+            for offset in range(max(idx - block * self.block_size, 0), self.block_size):
+                bits[offset >> 3] &= ~(1 << (offset & 7))
+            self._dirty.add(block)
+
+    def next_absent(self, idx: int) -> int:
+        """Наименьший ID >= idx, которого нет в множестве; полностью заполненные блоки пропускаются целиком."""
+        while True:
+            bits = self._blocks.get(idx // self.block_size)
+            if bits is None:
+                return idx
+            if bits == self._full:
+                idx = (idx // self.block_size + 1) * self.block_size
+            elif idx not in self:
+                return idx
+            else:
+                idx += 1
+
+    def dirty_blocks(self) -> Dict[int, bytes]:
+        dirty = {block: bytes(self._blocks[block]) for block in self._dirty}
+        self._dirty.clear()
+        return dirty
+
+
+class SparseIdProber:
+    """
+    Выдаёт ID для проверки в диапазоне [start, end) и учится на результатах.
+
+    - ID из misses (известные промахи прошлых запусков) не запрашиваются повторно;
+    - после gap_threshold промахов подряд шаг удваивается до max_stride, так что пустая область
+      стоит примерно в max_stride раз меньше запросов; пропущенный перед найденной вакансией
+      участок возвращается в очередь и проверяется подряд, чтобы не потерять начало плотной области.
+      Плотная область уже max_stride посреди пустой может быть пропущена целиком - поэтому шаг небольшой;
+    - при end=None обход останавливается, когда за последней найденной вакансией horizon ID
+      подряд ничего нет: верхняя граница - последняя найденная вакансия.
+
+    ID выше верхней границы ещё не выданы, а не удалены: их промахи не попадают в misses, а
+    resume_point не заходит за границу, поэтому хвост за последней вакансией проверяется при каждом запуске.
+    known_upper_bound - граница, найденная прошлыми запусками.
+
+    Итератор синхронный и общий для всех воркеров; результаты сообщаются через record().
+    """
+
+    def __init__(
+            self,
+            start: int,
+            end: Optional[int] = None,
+            misses: Optional[IdBitmap] = None,
+            checkpoint: Optional[ContiguousCheckpoint] = None,
+            gap_threshold: int = 32,
+            max_stride: int = 64,
+            horizon: int = 10_000,
+            known_upper_bound: Optional[int] = None
+    ):
+        self.end = end
+        self.misses = misses if misses is not None else IdBitmap()
+        self.checkpoint = checkpoint if checkpoint is not None else ContiguousCheckpoint(start)
+        self.gap_threshold = gap_threshold
+        self.max_stride = max_stride
+        self.horizon = horizon
+
+        self.start = start
+        self.max_hit: Optional[int] = known_upper_bound - 1 if known_upper_bound is not None else None
+        self.probed = 0
+        self.hits = 0
+        self.known_misses_skipped = 0
+        self.galloped = 0
+        self._next = start
+        self._miss_streak = 0
+        self._backfill: Deque[int] = deque()
+        # Пропущенные галопом участки: ID, запрошенный после участка -> начало участка
+        self._gaps: Dict[int, int] = {}
+        # Промахи выше верхней границы: станут промахами в misses, только если выше найдётся вакансия
+        self._tail_misses: List[int] = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        while self._backfill:
+            idx = self._backfill.popleft()
+            if idx not in self.misses:
+                self.probed += 1
+                return idx
+            # Известный промах не запрашивается, но обработан: иначе чекпоинт навсегда остановится перед ним
+            self.known_misses_skipped += 1
+            self.checkpoint.mark_done(idx)
+
+        idx = self.misses.next_absent(self._next)
+        self.known_misses_skipped += idx - self._next
+        self.checkpoint.mark_range(self._next, idx)
+        if self._exhausted(idx):
+            raise StopIteration
+
+        stride = self._stride()
+        if stride > 1:
+            probe = idx + stride - 1 if self.end is None else min(idx + stride - 1, self.end - 1)
+            # Участок считается обработанным только после ответа по probe - до этого чекпоинт стоит перед ним
+            self._gaps[probe] = idx
+            self.galloped += probe - idx
+            idx = probe
+
+        self._next = idx + 1
+        self.probed += 1
+        return idx
+
+    @property
+    def upper_bound(self) -> Optional[int]:
+        """Первый ID за последней найденной вакансией - текущая верхняя граница пространства ID."""
+        return self.max_hit + 1 if self.max_hit is not None else None
+
+    def record(self, idx: int, found: Optional[bool]):
+        """
+        Сообщает результат запроса: True - вакансия есть, False - ID пуст,
+        None - ошибка, по которой о наличии вакансии ничего не известно.
+        """
+        gap_start = self._gaps.pop(idx, None)
+        if found:
+            self.hits += 1
+            self._miss_streak = 0
+            self.max_hit = idx if self.max_hit is None else max(self.max_hit, idx)
+            if self._tail_misses:
+                below = [miss for miss in self._tail_misses if miss < idx]
+                self._tail_misses = [miss for miss in self._tail_misses if miss > idx]
+                for miss in below:
+                    self.misses.add(miss)
+            if gap_start is not None:
+                # Вакансия сразу после пропуска - вероятно начало плотной области, проверяем пропуск подряд
+                self._backfill.extend(range(gap_start, idx))
+                self.galloped -= idx - gap_start
+            return
+
+        if found is False:
+            if self.max_hit is not None and idx < self.max_hit:
+                self.misses.add(idx)
+            else:
+                self._tail_misses.append(idx)
+            self._miss_streak += 1
+        if gap_start is not None:
+            self.checkpoint.mark_range(gap_start, idx)
+
+    def resume_point(self) -> int:
+        """
+        ID, с которого продолжать следующий запуск: чекпоинт, но не выше верхней границы,
+        а без найденных вакансий - начало диапазона.
+        """
+        bound = self.upper_bound if self.upper_bound is not None else self.start
+        return min(self.checkpoint.value, max(bound, self.start))
+
+    def stats(self) -> str:
+        per_hit = self.probed / self.hits if self.hits else float("inf")
+        return (f"probed={self.probed}, found={self.hits}, requests_per_vacancy={per_hit:.2f}, "
+                f"known_misses_skipped={self.known_misses_skipped}, galloped_over={self.galloped}, "
+                f"upper_bound={self.upper_bound}")
+
+    def _stride(self) -> int:
+        excess = self._miss_streak - self.gap_threshold
+        return 1 if excess < 0 else min(2 ** min(excess + 1, 30), self.max_stride)
+
+    def _exhausted(self, idx: int) -> bool:
+        if self.end is not None:
+            return idx >= self.end
+        last_hit = self.max_hit if self.max_hit is not None else self.start
+        return idx - last_hit > self.horizon
+
@@ -0,0 +1,21 @@
+"""
+Module Description:
+Module decodes JSON with orjson when it is installed and falls back to the standard library otherwise.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Разбирает JSON прямо из байт ответа, без промежуточной строки."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
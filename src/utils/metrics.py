@@ -0,0 +1,231 @@
+"""
+Module Description:
+Module collects request metrics per source and endpoint: counters and HDR-style latency histograms,
+exported as a Prometheus text file or a JSON snapshot.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+DEFAULT_EXPORT_INTERVAL = 30.0
+
+# Числовые и хешеподобные сегменты пути заменяются на {id}, чтобы число эндпоинтов не росло с каждой вакансией
+_ID_SEGMENT_RE = re.compile(r"/(?:\d+|[0-9a-f]{16,})(?=/|$)")
+
+
+def endpoint_of(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.netloc + _ID_SEGMENT_RE.sub("/{id}", parts.path or "/")
+
+
+class LatencyHistogram:
+    """
+    Гистограмма в духе HdrHistogram: на каждую степень двойки приходится 2**(precision_bits - 1)
+    линейных корзин, поэтому относительная ошибка квантилей не превышает 2**(1 - precision_bits)
+    при любом масштабе значений. Значения хранятся в микросекундах, запись - O(1) без аллокаций.
+    """
+
+    def __init__(self, precision_bits: int = 6):
+        self.precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self._half = self._sub_buckets >> 1
+        self._counts: List[int] = [0] * self._sub_buckets
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, seconds: float):
+        value = max(int(seconds * 1_000_000), 0)
+        index = self._index(value)
+        if index >= len(self._counts):
+            self._counts.extend([0] * (index + 1 - len(self._counts)))
+        self._counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("Histograms with different precision can't be merged")
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for index, count in enumerate(other._counts):
+            self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Верхняя граница корзины, в которую попадает q-квантиль, в секундах."""
+        if not self.count:
+            return None
+        rank = max(int(q * self.count + 0.5), 1)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_bound(index) / 1_000_000, self.max)
+        return self.max
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_buckets:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self._sub_buckets + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _upper_bound(self, index: int) -> int:
+        if index < self._sub_buckets:
+            return index
+        shift, offset = divmod(index - self._sub_buckets, self._half)
+        shift += 1
+        return ((offset + self._half + 1) << shift) - 1
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    bytes_received: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class RequestMetrics:
+    """Метрики запросов по ключу (источник, эндпоинт). Все операции синхронные и выполняются в цикле событий."""
+
+    def __init__(self, prefix: str = "vacancy_crawler"):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def stats(self, source: str, endpoint: str) -> EndpointStats:
+        key = (source, endpoint)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = EndpointStats()
+        return stats
+
+    def observe(self, source: str, endpoint: str, status: Any, seconds: float, bytes_received: int = 0):
+        """Учитывает одну попытку запроса: status - HTTP-код или метка вроде "error"/"browser"."""
+        stats = self.stats(source, endpoint)
+        stats.requests += 1
+        stats.statuses[str(status)] += 1
+        stats.bytes_received += bytes_received
+        stats.latency.record(seconds)
+
+    def retry(self, source: str, endpoint: str):
+        self.stats(source, endpoint).retries += 1
+
+    def error(self, source: str, endpoint: str, seconds: float):
+        self.stats(source, endpoint).errors += 1
+        self.observe(source, endpoint, "error", seconds)
+
+    def cache_hit(self, source: str, endpoint: str):
+        self.stats(source, endpoint).cache_hits += 1
+
+    def latency(self, source: Optional[str] = None) -> LatencyHistogram:
+        """Гистограмма задержек по всем эндпоинтам источника (или по всем источникам)."""
+        merged = LatencyHistogram()
+        for (stats_source, _), stats in self._stats.items():
+            if source is None or stats_source == source:
+                merged.merge(stats.latency)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        endpoints = []
+        for (source, endpoint), stats in sorted(self._stats.items()):
+            latency = stats.latency
+            endpoints.append({
+                "source": source,
+                "endpoint": endpoint,
+                "requests": stats.requests,
+                "retries": stats.retries,
+                "errors": stats.errors,
+                "cache_hits": stats.cache_hits,
+                "bytes_received": stats.bytes_received,
+                "statuses": dict(stats.statuses),
+                "latency_seconds": {
+                    "count": latency.count,
+                    "sum": latency.total,
+                    "min": latency.min,
+                    "max": latency.max,
+                    **{f"p{q * 100:g}": latency.quantile(q) for q in QUANTILES},
+                },
+            })
+        return {"started_at": self.started_at, "timestamp": time.time(), "endpoints": endpoints}
+
+    def to_prometheus(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# TYPE {p}_requests_total counter",
+            f"# TYPE {p}_retries_total counter",
+            f"# TYPE {p}_errors_total counter",
+            f"# TYPE {p}_cache_hits_total counter",
+            f"# TYPE {p}_response_bytes_total counter",
+            f"# TYPE {p}_request_duration_seconds summary",
+        ]
+        for (source, endpoint), stats in sorted(self._stats.items()):
+            labels = f'source="{source}",endpoint="{_escape(endpoint)}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'{p}_requests_total{{{labels},status="{status}"}} {count}')
+            lines.append(f"{p}_retries_total{{{labels}}} {stats.retries}")
+            lines.append(f"{p}_errors_total{{{labels}}} {stats.errors}")
+            lines.append(f"{p}_cache_hits_total{{{labels}}} {stats.cache_hits}")
+            lines.append(f"{p}_response_bytes_total{{{labels}}} {stats.bytes_received}")
+            for q in QUANTILES:
+                value = stats.latency.quantile(q)
+                if value is not None:
+                    lines.append(f'{p}_request_duration_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"{p}_request_duration_seconds_sum{{{labels}}} {stats.latency.total:.6f}")
+            lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {stats.latency.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Атомарно записывает снимок: .json - JSON, любое другое расширение - текстовый формат Prometheus."""
+        content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2) if path.endswith(".json") \
+            else self.to_prometheus()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    async def export_periodically(self, path: str, interval: float = DEFAULT_EXPORT_INTERVAL):
+        """Сбрасывает метрики в path каждые interval секунд и ещё раз при отмене задачи."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.dump(path)
+        finally:
+            self.dump(path)
+            log.info(f"Request metrics written to {path}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+default_metrics = RequestMetrics()
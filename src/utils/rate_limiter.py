@@ -0,0 +1,163 @@
+"""
+Module Description:
+Module provides asyncio-native per-host token-bucket rate limiting with AIMD rate adaptation.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Ответы, после которых запрос повторяется
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+# Ответы, которыми сервер просит снизить скорость; прочие 5xx скорость не меняют
+BACKOFF_STATUSES = {429, 503}
+# Окно не короче этого: иначе при быстром сервере скорость росла бы скачками
+MIN_WINDOW = 0.05
+
+
+@dataclass
+class HostBucket:
+    rate: float
+    min_rate: float
+    max_rate: float
+    burst: float
+    tokens: float = 0.0
+    blocked_until: float = 0.0
+    updated_at: float = field(default_factory=time.monotonic)
+    # Сглаженное время от выдачи токена до ответа: длина окна AIMD
+    rtt: Optional[float] = None
+    decreased_at: float = 0.0
+    window_started_at: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket на каждый хост со скоростью, подстраиваемой по окнам (AIMD, как окно перегрузки TCP).
+
+    Окно - время ответа на запрос (RTT). За окно без отказов скорость растёт на additive_increase
+    запросов за окно; на 429/503 она уменьшается в multiplicative_decrease раз, но не чаще раза за окно:
+    отказы на запросы, отправленные до последнего снижения, уже учтены им и игнорируются.
+    Заголовок Retry-After блокирует хост на указанное время.
+    """
+
+    def __init__(
+            self,
+            default_rate: float = 2.0,
+            min_rate: float = 0.1,
+            max_rate: float = 20.0,
+            burst: float = 1.0,
+            additive_increase: float = 1.0,
+            multiplicative_decrease: float = 0.5
+    ):
+        self.default_rate = default_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self._buckets: Dict[str, HostBucket] = {}
+
+    def configure(
+            self,
+            host: str,
+            rate: float,
+            max_rate: Optional[float] = None,
+            min_rate: Optional[float] = None,
+            burst: Optional[float] = None,
+            override: bool = False
+    ):
+        """Задаёт стартовую скорость для хоста, если он ещё не настроен (или override=True)."""
+        if host in self._buckets and not override:
+            return
+        self._buckets[host] = HostBucket(
+            rate=rate,
+            min_rate=min_rate if min_rate is not None else self.min_rate,
+            max_rate=max_rate if max_rate is not None else max(rate, self.max_rate),
+            burst=burst if burst is not None else self.burst,
+            tokens=burst if burst is not None else self.burst,
+        )
+
+    def rate(self, host: str) -> float:
+        return self._bucket(host).rate
+
+    async def acquire(self, host: str) -> float:
+        """Ждёт, пока для хоста не освободится токен; возвращает момент выдачи (time.monotonic) для on_response."""
+        bucket = self._bucket(host)
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+                wait = bucket.blocked_until - now
+                if wait <= 0:
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        return now
+                    wait = (1 - bucket.tokens) / bucket.rate
+                await asyncio.sleep(wait)
+
+    def on_response(self, host: str, status_code: int, retry_after: Optional[str] = None,
+                    sent_at: Optional[float] = None):
+        """
+        Подстраивает скорость хоста по коду ответа (AIMD).
+
+        sent_at - значение, которое вернул acquire для этого запроса; без него запрос считается
+        отправленным одно окно назад.
+        """
+        bucket = self._bucket(host)
+        now = time.monotonic()
+        if sent_at is not None:
+            elapsed = now - sent_at
+            bucket.rtt = elapsed if bucket.rtt is None else 0.8 * bucket.rtt + 0.2 * elapsed
+        window = max(bucket.rtt if bucket.rtt is not None else 1.0, MIN_WINDOW)
+        if sent_at is None:
+            sent_at = now - window
+
+        if status_code in BACKOFF_STATUSES:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            if sent_at < bucket.decreased_at:
+                return
+            bucket.rate = max(bucket.min_rate, bucket.rate * self.multiplicative_decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.decreased_at = bucket.window_started_at = now
+            log.warning(f"{host} answered {status_code}, rate lowered to {bucket.rate:.2f} req/s"
+                        + (f", blocked for {delay:.1f}s" if delay is not None else ""))
+        elif status_code < 400 and sent_at >= bucket.window_started_at:
+            # Ответ на запрос, отправленный уже в этом окне: окно прошло без снижений
+            bucket.rate = min(bucket.max_rate, bucket.rate + self.additive_increase / window)
+            bucket.window_started_at = now
+
+    def _bucket(self, host: str) -> HostBucket:
+        if host not in self._buckets:
+            self.configure(host, self.default_rate)
+        return self._buckets[host]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбирает Retry-After в секундах или в формате HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+default_rate_limiter = AdaptiveRateLimiter()
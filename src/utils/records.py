@@ -0,0 +1,86 @@
+"""
+Module Description:
+Module defines compact slotted vacancy records that keep only the mapped fields of API responses.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.utils.json_codec import loads
+from src.utils.rabota_ru_mapper import COLUMNS as RABOTA_RU_COLUMNS
+
+_EMPTY: Dict[str, Any] = {}
+
+
+@dataclass(slots=True)
+class RabotaRuVacancy:
+    """
+    Вакансия rabota.ru: только поля из rabota_ru_mapper.COLUMNS.
+
+    Полный ответ API (описание компании, метро, навыки и т.д.) разбирается и сразу отбрасывается,
+    поэтому на время обхода в памяти и в хранилище остаётся только то, что попадает в CSV.
+    """
+    id: Any
+    title: Optional[str] = None
+    salary_from: Optional[float] = None
+    salary_to: Optional[float] = None
+    salary_currency: Optional[str] = None
+    salary_pay_type: Optional[str] = None
+    description: Optional[str] = None
+    contact_name: Optional[str] = None
+    contact_email: Optional[str] = None
+    contact_phone: Optional[str] = None
+    operating_schedule: Optional[str] = None
+    company_name: Optional[str] = None
+    company_id: Any = None
+    company_type: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, json_data: Dict[str, Any]) -> "RabotaRuVacancy":
+        get = json_data.get
+        salary = get('salary') or _EMPTY
+        contact = get('contact_person') or _EMPTY
+        phones = contact.get('phones') if contact.get('has_phone') else None
+        company = get('company') or _EMPTY
+        return cls(
+            get('id'),
+            get('title'),
+            salary.get('from'),
+            salary.get('to'),
+            salary.get('currency'),
+            salary.get('pay_type'),
+            get('description'),
+            contact.get('name'),
+            contact.get('email'),
+            phones[0]['number_international'] if phones else None,
+            (get('operating_schedule') or _EMPTY).get('name'),
+            company.get('name'),
+            company.get('id'),
+            company.get('type'),
+        )
+
+    @classmethod
+    def from_response(cls, content: bytes) -> Optional["RabotaRuVacancy"]:
+        """Разбирает тело ответа /v6/vacancy.json; None, если вакансии в ответе нет."""
+        payload = loads(content)
+        vacancy = payload.get('response') if isinstance(payload, dict) else None
+        return cls.from_api(vacancy) if vacancy else None
+
+    @classmethod
+    def from_stored(cls, record: Dict[str, Any]) -> "RabotaRuVacancy":
+        """Запись из хранилища: плоская или, для хранилищ прошлых версий, полный ответ API."""
+        if isinstance(record.get('salary'), dict) or isinstance(record.get('company'), dict):
+            return cls.from_api(record)
+        return cls(**{column: record.get(column) for column in RABOTA_RU_COLUMNS})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {column: getattr(self, column) for column in RABOTA_RU_COLUMNS}
+
+
+def rabota_ru_frame(records: Iterable[RabotaRuVacancy]) -> pd.DataFrame:
+    rows: List[tuple] = [tuple(getattr(record, column) for column in RABOTA_RU_COLUMNS) for record in records]
+    return pd.DataFrame.from_records(rows, columns=list(RABOTA_RU_COLUMNS))
@@ -0,0 +1,123 @@
+"""
+Module Description:
+Module implements the Snowball stemmer for Russian (https://snowballstem.org/algorithms/russian/stemmer.html)
+without external dependencies.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+from functools import lru_cache
+from typing import Optional, Tuple
+
+VOWELS = frozenset("аеиоуыэюя")
+
+
+def _longest_first(*endings: str) -> Tuple[str, ...]:
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+# Окончания групп 1 допускаются только после "а" или "я" (сама буква остаётся в основе)
+_PERFECTIVE_GERUND_1 = _longest_first("в", "вши", "вшись")
+_PERFECTIVE_GERUND_2 = _longest_first("ив", "ивши", "ившись", "ыв", "ывши", "ывшись")
+_ADJECTIVE = _longest_first(
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "его", "ого", "ему", "ому",
+    "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+_PARTICIPLE_1 = _longest_first("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = _longest_first("ивш", "ывш", "ующ")
+_REFLEXIVE = _longest_first("ся", "сь")
+_VERB_1 = _longest_first("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь",
+                         "нно")
+_VERB_2 = _longest_first(
+    "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ило", "ыло",
+    "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю",
+)
+_NOUN = _longest_first(
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией", "ей", "ой", "ий", "й", "иям", "ям",
+    "ием", "ем", "ам", "ом", "о", "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья", "я",
+)
+_SUPERLATIVE = _longest_first("ейш", "ейше")
+_DERIVATIONAL = _longest_first("ост", "ость")
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    """Начала областей RV и R2 по правилам Snowball."""
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    r1 = _after_vowel_consonant(word, 0)
+    return rv, _after_vowel_consonant(word, r1)
+
+
+def _after_vowel_consonant(word: str, start: int) -> int:
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(rv: str, endings: Tuple[str, ...], after_a: Tuple[str, ...] = ()) -> Optional[str]:
+    """Снимает самое длинное подходящее окончание; окончания after_a - только после "а"/"я"."""
+    best = None
+    for ending in after_a:
+        if rv.endswith(ending) and rv[:-len(ending)][-1:] in ("а", "я"):
+            best = ending
+            break
+    for ending in endings:
+        if rv.endswith(ending):
+            if best is None or len(ending) > len(best):
+                best = ending
+            break
+    return rv[:-len(best)] if best is not None else None
+
+
+def _strip_adjectival(rv: str) -> Optional[str]:
+    stem = _strip(rv, _ADJECTIVE)
+    if stem is None:
+        return None
+    participle = _strip(stem, _PARTICIPLE_2, _PARTICIPLE_1)
+    return participle if participle is not None else stem
+
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    """Основа русского слова в нижнем регистре; слова без кириллицы возвращаются как есть."""
+    word = word.replace("ё", "е")
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # Шаг 1: деепричастие, иначе возвратная частица и одно из прилагательного, глагола, существительного
+    stripped = _strip(rv, _PERFECTIVE_GERUND_2, _PERFECTIVE_GERUND_1)
+    if stripped is None:
+        reflexive = _strip(rv, _REFLEXIVE)
+        if reflexive is not None:
+            rv = reflexive
+        for step in (_strip_adjectival, lambda s: _strip(s, _VERB_2, _VERB_1), lambda s: _strip(s, _NOUN)):
+            stripped = step(rv)
+            if stripped is not None:
+                break
+    if stripped is not None:
+        rv = stripped
+
+    # Шаг 2
+    if rv.endswith("и"):
+        rv = rv[:-1]
+
+    # Шаг 3: словообразовательный суффикс, только внутри R2
+    for ending in _DERIVATIONAL:
+        if rv.endswith(ending) and rv_start + len(rv) - len(ending) >= r2_start:
+            rv = rv[:-len(ending)]
+            break
+
+    # Шаг 4
+    if rv.endswith("нн"):
+        rv = rv[:-1]
+    else:
+        superlative = _strip(rv, _SUPERLATIVE)
+        if superlative is not None:
+            rv = superlative[:-1] if superlative.endswith("нн") else superlative
+        elif rv.endswith("ь"):
+            rv = rv[:-1]
+    return prefix + rv
@@ -5,11 +5,27 @@ This module performs XYZ functionality.
 Author: Denis Makukh
 Date: 28.02.2025
 """
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import pandas as pd
 
-def extend_vacancies_from_response(response, vacancies):
+
+def extend_vacancies_from_response(response, vacancies, seen_ids: Optional[Set[int]] = None) -> Tuple[int, int]:
+    """
+    Дописывает вакансии из ответа API в vacancies.
+
+    Если передан seen_ids, вакансии с уже встречавшимся id отбрасываются до построения записи.
+    Возвращает пару (новых, дубликатов).
+    """
+    new, duplicates = 0, 0
     if response and 'objects' in response:
         for vacancy in response['objects']:
+            if seen_ids is not None:
+                vacancy_id = vacancy.get('id')
+                if vacancy_id in seen_ids:
+                    duplicates += 1
+                    continue
+                seen_ids.add(vacancy_id)
             vacancy_data = {
                 'vacancy_id': vacancy.get('id'),
                 'payment_from': vacancy.get('payment_from'),
@@ -25,3 +41,66 @@ def extend_vacancies_from_response(response, vacancies):
                 'link': vacancy.get('link')
             }
             vacancies.append(vacancy_data)
+            new += 1
+    return new, duplicates
+
+
+COLUMNS = (
+    'vacancy_id', 'payment_from', 'payment_to', 'currency', 'date_published', 'address', 'profession', 'candidat',
+    'type_of_work', 'languages', 'phone', 'link',
+)
+
+# Поля ответа API, которые копируются в колонку как есть; остальные колонки разбираются отдельно
+_API_FIELDS = (
+    'id', 'payment_from', 'payment_to', 'currency', 'date_published', 'address', 'profession', 'candidat',
+)
+
+
+class SuperJobColumns:
+    """Колоночный аналог extend_vacancies_from_response: поля раскладываются по спискам-колонкам за один проход."""
+
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {column: [] for column in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns['vacancy_id'])
+
+    def extend_from_response(self, response, seen_ids: Optional[Set[int]] = None) -> Tuple[int, int]:
+        """Возвращает пару (новых, дубликатов), как extend_vacancies_from_response."""
+        if not response or 'objects' not in response:
+            return 0, 0
+        c = self.columns
+        appends = [(field, c[column].append) for column, field in zip(COLUMNS, _API_FIELDS)]
+        type_of_work, languages = c['type_of_work'].append, c['languages'].append
+        phone, link = c['phone'].append, c['link'].append
+
+        new, duplicates = 0, 0
+        for vacancy in response['objects']:
+            if seen_ids is not None:
+                vacancy_id = vacancy.get('id')
+                if vacancy_id in seen_ids:
+                    duplicates += 1
+                    continue
+                seen_ids.add(vacancy_id)
+            get = vacancy.get
+            for field, append in appends:
+                append(get(field))
+            type_of_work((get('type_of_work') or {}).get('title'))
+            languages(list(get('languages') or []))
+            phone(get('phone'))
+            link(get('link'))
+            new += 1
+        return new, duplicates
+
+    def merge(self, other: 'SuperJobColumns') -> 'SuperJobColumns':
+        for column in COLUMNS:
+            self.columns[column].extend(other.columns[column])
+        return self
+
+    def records(self, start: int = 0) -> List[Dict[str, Any]]:
+        """Строки начиная с позиции start - для хранилища, которому нужны записи."""
+        columns = [self.columns[column][start:] for column in COLUMNS]
+        return [dict(zip(COLUMNS, row)) for row in zip(*columns)]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, columns=list(COLUMNS))
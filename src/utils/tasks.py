@@ -0,0 +1,26 @@
+"""
+Module Description:
+Module provides a gather that does not leave orphaned tasks: when one awaitable fails or the caller
+is cancelled, the others are cancelled and awaited before the error propagates.
+
+Author: Denis Makukh
+Date: 18.10.2026
+"""
+import asyncio
+from typing import Any, Awaitable, List
+
+
+async def gather_or_cancel(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    Как asyncio.gather, но при первой ошибке или отмене остальные задачи отменяются и дожидаются.
+
+    Исключение пробрасывается как есть (не ExceptionGroup, как у TaskGroup), поэтому вызывающий код
+    обрабатывает ошибки так же, как с обычным gather.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)